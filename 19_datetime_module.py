@@ -101,6 +101,116 @@ for date_str in date_strings:
         except ValueError:
             continue
 
+# Fast parsing of fixed-layout timestamps
+# strptime is flexible but slow: it takes a lock and runs a regex on every
+# call. When every line uses the same layout we can check the separators
+# at known positions and slice the fields out directly.
+class FastTimestampParser:
+    """Parse timestamps that all share one fixed-width layout
+    
+    Supports layouts built from %Y, %m, %d, %H, %M, %S and literal
+    characters, e.g. "%Y-%m-%d %H:%M:%S" or "%d/%m/%Y %H:%M:%S".
+    """
+    
+    FIELD_WIDTHS = {"Y": 4, "m": 2, "d": 2, "H": 2, "M": 2, "S": 2}
+    
+    def __init__(self, layout="%Y-%m-%d %H:%M:%S"):
+        self.layout = layout
+        self.fields = {}            # directive -> (start, stop)
+        self.literals = []          # (position, character)
+        pos = 0
+        i = 0
+        while i < len(layout):
+            if layout[i] == "%":
+                directive = layout[i + 1]
+                if directive not in self.FIELD_WIDTHS:
+                    raise ValueError(f"unsupported directive %{directive} in {layout!r}")
+                self.fields[directive] = (pos, pos + self.FIELD_WIDTHS[directive])
+                pos += self.FIELD_WIDTHS[directive]
+                i += 2
+            else:
+                self.literals.append((pos, layout[i]))
+                pos += 1
+                i += 1
+        self.length = pos
+        date_slices = [self.fields[d] for d in "Ymd" if d in self.fields]
+        # Without date fields there is no day to cache; strptime does fine
+        self._strptime = not date_slices
+        if date_slices:
+            self._date_span = (min(s for s, _ in date_slices), max(e for _, e in date_slices))
+        # ISO layouts can go straight to the C-implemented fromisoformat
+        self._iso = layout in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S")
+        self._last_day = None       # date text of the previous timestamp
+        self._last_ymd = None       # its (year, month, day)
+    
+    def _field(self, s, directive, default=0):
+        if directive not in self.fields:
+            return default
+        start, stop = self.fields[directive]
+        text = s[start:stop]
+        if not text.isdigit():
+            raise ValueError(f"time data {s!r} does not match layout {self.layout!r}")
+        return int(text)
+    
+    def parse(self, s):
+        """Parse one timestamp string into a datetime"""
+        if self._iso:
+            # fromisoformat checks the date part; make sure no offset or
+            # fraction sneaks in where the fixed layout has none
+            if len(s) != 19 or s[10] != self.layout[8] or s[13] != ":" or s[16] != ":":
+                raise ValueError(f"time data {s!r} does not match layout {self.layout!r}")
+            return datetime.fromisoformat(s)
+        if self._strptime:
+            return datetime.strptime(s, self.layout)
+        if len(s) != self.length or any(s[pos] != char for pos, char in self.literals):
+            raise ValueError(f"time data {s!r} does not match layout {self.layout!r}")
+        day = s[self._date_span[0]:self._date_span[1]]
+        if day != self._last_day:
+            # Consecutive log lines are usually on the same day, so the date
+            # fields are only converted when the day changes
+            self._last_ymd = (self._field(s, "Y", 1900), self._field(s, "m", 1), self._field(s, "d", 1))
+            self._last_day = day
+        year, month, day_of_month = self._last_ymd
+        return datetime(year, month, day_of_month,
+                        self._field(s, "H"), self._field(s, "M"), self._field(s, "S"))
+    
+    def parse_many(self, strings):
+        """Parse a batch of timestamps, returning a list of datetimes"""
+        parse = self.parse
+        return [parse(s) for s in strings]
+
+fast_parser = FastTimestampParser()
+print(f"Fast parse: {fast_parser.parse('2024-01-15 14:30:00')}")
+print(f"Batch parse: {fast_parser.parse_many(['2024-01-15 23:59:59', '2024-01-16 00:00:00'])}")
+european_parser = FastTimestampParser("%d/%m/%Y %H:%M:%S")
+print(f"European layout: {european_parser.parse('15/01/2024 14:30:00')}")
+
+def benchmark_timestamp_parsers(n=20000):
+    """Time strptime, fromisoformat and FastTimestampParser on n timestamps"""
+    import time as time_module
+    base = datetime(2024, 1, 15)
+    moments = [base + timedelta(seconds=i * 7) for i in range(n)]
+    iso = [m.strftime("%Y-%m-%d %H:%M:%S") for m in moments]
+    european = [m.strftime("%d/%m/%Y %H:%M:%S") for m in moments]
+    candidates = {
+        "strptime (ISO)": (lambda s: datetime.strptime(s, "%Y-%m-%d %H:%M:%S"), iso),
+        "fromisoformat (ISO)": (datetime.fromisoformat, iso),
+        "FastTimestampParser (ISO)": (FastTimestampParser().parse, iso),
+        "strptime (European)": (lambda s: datetime.strptime(s, "%d/%m/%Y %H:%M:%S"), european),
+        "FastTimestampParser (European)": (FastTimestampParser("%d/%m/%Y %H:%M:%S").parse, european),
+    }
+    results = {}
+    for name, (parse, stamps) in candidates.items():
+        start = time_module.perf_counter()
+        for s in stamps:
+            parse(s)
+        results[name] = time_module.perf_counter() - start
+    return results
+
+print("Parsing 20,000 timestamps:")
+for name, seconds in benchmark_timestamp_parsers().items():
+    print(f"  {name}: {seconds * 1000:.1f} ms")
+
 # 4. Date Arithmetic and Comparisons
 print("\n=== Date Arithmetic and Comparisons ===")
 
@@ -239,32 +349,147 @@ print("\nEvery 3 days:")
 for d in date_range(start, end, timedelta(days=3)):
     print(f"  {d}")
 
+# Compact date ranges: store day ordinals in an array('i') (4 bytes per
+# day) and only build date objects when someone asks for one
+from array import array
+
+class DateRangeArray:
+    """Date range held as an array of ordinals, materialized on demand"""
+    
+    def __init__(self, ordinals):
+        self.ordinals = ordinals
+    
+    @classmethod
+    def between(cls, start_date, end_date, step_days=1):
+        """Inclusive range like date_range(), but as ordinals"""
+        return cls(array('i', range(start_date.toordinal(), end_date.toordinal() + 1, step_days)))
+    
+    def __len__(self):
+        return len(self.ordinals)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return DateRangeArray(self.ordinals[index])
+        return date.fromordinal(self.ordinals[index])
+    
+    def __iter__(self):
+        return map(date.fromordinal, self.ordinals)
+    
+    def weekdays(self):
+        """Weekday numbers (0=Monday) for every date, without creating dates"""
+        return array('b', [(o - 1) % 7 for o in self.ordinals])
+
+def epoch_range(start_time, end_time, step_seconds=60):
+    """Epoch seconds from start_time to end_time (inclusive) as an array('q')"""
+    return array('q', range(int(start_time.timestamp()), int(end_time.timestamp()) + 1, step_seconds))
+
+year_of_days = DateRangeArray.between(date(2024, 1, 1), date(2024, 12, 31))
+print(f"\nDays in 2024: {len(year_of_days)}, stored in {year_of_days.ordinals.itemsize * len(year_of_days)} bytes")
+print(f"Day 100 of 2024: {year_of_days[99]}")
+print(f"Weekly sample: {list(year_of_days[::7][:3])}")
+
+minutes = epoch_range(datetime(2024, 1, 1, tzinfo=timezone.utc), datetime(2024, 1, 2, tzinfo=timezone.utc))
+print(f"Minute timestamps in one day: {len(minutes)}")
+
 # 10. Business Days Calculation
 print("\n=== Business Days Calculation ===")
 
-def business_days_between(start_date, end_date):
-    """Calculate business days between two dates"""
-    current = start_date
-    business_days = 0
+from bisect import bisect_left, bisect_right
+
+# date.toordinal() counts days from 0001-01-01, which was a Monday, so
+# every 7-day block of ordinals holds exactly 5 business days. That lets us
+# count weekdays with plain arithmetic instead of walking day by day.
+def weekdays_before(ordinal):
+    """Count Monday-Friday days with ordinal < the given ordinal"""
+    weeks, extra = divmod(ordinal - 1, 7)
+    return weeks * 5 + min(extra, 5)
+
+def weekday_from_index(index):
+    """Return the ordinal of the index-th weekday (inverse of weekdays_before)"""
+    weeks, extra = divmod(index, 5)
+    return 1 + weeks * 7 + extra
+
+class HolidayCalendar:
+    """Business-day arithmetic that skips weekends and a set of holidays
     
-    while current <= end_date:
-        if current.weekday() < 5:  # Monday = 0, Sunday = 6
-            business_days += 1
-        current += timedelta(days=1)
+    Holidays are kept as a sorted array of ordinals, so every lookup is a
+    bisect (O(log H)) and no call ever loops over individual days.
+    """
     
-    return business_days
-
-def add_business_days(start_date, days):
-    """Add business days to a date"""
-    current = start_date
-    added_days = 0
+    def __init__(self, holidays=()):
+        # Weekend holidays never change the count, so drop them up front
+        ordinals = sorted({d.toordinal() for d in holidays if d.weekday() < 5})
+        self.ordinals = array('i', ordinals)
+        # For the i-th holiday: its weekday index minus i. This sequence never
+        # decreases, which lets add_business_days binary-search it.
+        self._shifted = array('i', (weekdays_before(o) - i for i, o in enumerate(ordinals)))
+    
+    def __len__(self):
+        return len(self.ordinals)
     
-    while added_days < days:
-        current += timedelta(days=1)
-        if current.weekday() < 5:  # Monday = 0, Sunday = 6
-            added_days += 1
+    def is_holiday(self, d):
+        """Check whether a date is a (weekday) holiday"""
+        ordinal = d.toordinal()
+        i = bisect_left(self.ordinals, ordinal)
+        return i < len(self.ordinals) and self.ordinals[i] == ordinal
     
-    return current
+    def is_business_day(self, d):
+        """Check whether a date is a weekday and not a holiday"""
+        return d.weekday() < 5 and not self.is_holiday(d)
+    
+    def _count(self, start_ordinal, end_ordinal):
+        """Business days in the inclusive ordinal range"""
+        if end_ordinal < start_ordinal:
+            return 0
+        days = weekdays_before(end_ordinal + 1) - weekdays_before(start_ordinal)
+        holidays = bisect_right(self.ordinals, end_ordinal) - bisect_left(self.ordinals, start_ordinal)
+        return days - holidays
+    
+    def business_days_between(self, start_date, end_date):
+        """Count business days from start_date to end_date (inclusive)"""
+        return self._count(start_date.toordinal(), end_date.toordinal())
+    
+    def _add(self, start_ordinal, days):
+        """Ordinal of the days-th business day after start_ordinal"""
+        if days <= 0:
+            return start_ordinal
+        first = weekdays_before(start_ordinal + 1)  # weekday index of next weekday
+        target = first + days - 1
+        # Holidays at or after `first` push the target one weekday later each.
+        # The first holiday that lands beyond the shifted target tells us how
+        # many holidays were skipped: find it by bisecting _shifted.
+        i0 = bisect_right(self.ordinals, start_ordinal)
+        skipped = bisect_right(self._shifted, target - i0, i0) - i0
+        return weekday_from_index(target + skipped)
+    
+    def add_business_days(self, start_date, days):
+        """Add business days to a date, skipping weekends and holidays"""
+        return date.fromordinal(self._add(start_date.toordinal(), days))
+    
+    def business_days_between_many(self, starts, ends):
+        """Count business days for many (start, end) pairs at once
+        
+        Accepts sequences of dates or ordinals and returns an array('i').
+        """
+        to_ordinal = lambda d: d if isinstance(d, int) else d.toordinal()
+        count = self._count
+        return array('i', [count(to_ordinal(s), to_ordinal(e)) for s, e in zip(starts, ends)])
+    
+    def add_business_days_many(self, starts, days):
+        """Add business days for many dates at once, returning ordinals"""
+        to_ordinal = lambda d: d if isinstance(d, int) else d.toordinal()
+        add = self._add
+        return array('i', [add(to_ordinal(s), n) for s, n in zip(starts, days)])
+
+NO_HOLIDAYS = HolidayCalendar()
+
+def business_days_between(start_date, end_date, holidays=NO_HOLIDAYS):
+    """Calculate business days between two dates"""
+    return holidays.business_days_between(start_date, end_date)
+
+def add_business_days(start_date, days, holidays=NO_HOLIDAYS):
+    """Add business days to a date"""
+    return holidays.add_business_days(start_date, days)
 
 # Test business days
 start = date(2024, 1, 15)  # Monday
@@ -276,6 +501,23 @@ print(f"Business days between {start} and {end}: {business_days}")
 new_date = add_business_days(start, 5)
 print(f"5 business days after {start}: {new_date}")
 
+# Holidays are skipped too
+us_holidays = HolidayCalendar([date(2024, 1, 1), date(2024, 1, 15), date(2024, 5, 27),
+                               date(2024, 7, 4), date(2024, 12, 25)])
+print(f"Business days in 2024 (with holidays): "
+      f"{business_days_between(date(2024, 1, 1), date(2024, 12, 31), us_holidays)}")
+print(f"10 business days after 2024-01-12: "
+      f"{add_business_days(date(2024, 1, 12), 10, us_holidays)}")
+
+# Long spans cost the same as short ones: no day-by-day loop
+print(f"Business days over 30 years: "
+      f"{business_days_between(date(2000, 1, 1), date(2029, 12, 31))}")
+
+# Batch API for many date pairs
+starts = [date(2024, 1, 1) + timedelta(days=i) for i in range(5)]
+ends = [d + timedelta(days=30) for d in starts]
+print(f"Batch business days: {list(us_holidays.business_days_between_many(starts, ends))}")
+
 # 11. Age Calculation
 print("\n=== Age Calculation ===")
 
@@ -313,32 +555,126 @@ print(f"Days until next birthday: {days_until}")
 print("\n=== Practical Applications ===")
 
 # Application 1: Log File Analysis
+from collections import Counter
+import heapq
+
+class LogView:
+    """Lazy, read-only slice of a LogAnalyzer's time-sorted entries"""
+    
+    def __init__(self, logs, start, stop):
+        self._logs = logs
+        self._start = start
+        self._stop = max(start, stop)
+    
+    def __len__(self):
+        return self._stop - self._start
+    
+    def __iter__(self):
+        logs = self._logs
+        for i in range(self._start, self._stop):
+            yield logs[i]
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return LogView(self._logs, self._start + start, self._start + stop)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("log view index out of range")
+        return self._logs[self._start + index]
+    
+    def __repr__(self):
+        return f"LogView({len(self)} entries)"
+
 class LogAnalyzer:
-    """Analyze log files with timestamps"""
+    """Analyze log files with timestamps
+    
+    Entries are kept sorted by time: in-order lines are appended, late
+    lines are buffered and merged in before the next query. Queries use
+    binary search and return lazy LogView slices, and per-day/per-hour
+    counters answer histogram questions without touching the entries.
+    """
     
     def __init__(self):
-        self.logs = []
+        self.logs = []          # (timestamp, message), sorted by timestamp
+        self._times = []        # timestamps only, parallel to self.logs for bisect
+        self._pending = []      # out-of-order entries waiting to be merged
+        self.daily_counts = Counter()
+        self.hourly_counts = Counter()
+        self.parser = FastTimestampParser()
     
     def add_log(self, timestamp_str, message):
         """Add a log entry"""
         try:
-            timestamp = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
-            self.logs.append((timestamp, message))
+            timestamp = self.parser.parse(timestamp_str)
         except ValueError:
             print(f"Invalid timestamp format: {timestamp_str}")
+            return
+        self.add_entry(timestamp, message)
+    
+    def add_logs(self, entries):
+        """Add many (timestamp_str, message) entries"""
+        for timestamp_str, message in entries:
+            self.add_log(timestamp_str, message)
+    
+    def add_entry(self, timestamp, message):
+        """Add an already-parsed entry"""
+        if not self._times or timestamp >= self._times[-1]:
+            self.logs.append((timestamp, message))
+            self._times.append(timestamp)
+        else:
+            self._pending.append((timestamp, message))
+        self.daily_counts[timestamp.date()] += 1
+        self.hourly_counts[timestamp.replace(minute=0, second=0, microsecond=0)] += 1
+    
+    def _merge_pending(self):
+        """Merge buffered out-of-order entries into the sorted list"""
+        if not self._pending:
+            return
+        self._pending.sort(key=lambda log: log[0])
+        self.logs = list(heapq.merge(self.logs, self._pending, key=lambda log: log[0]))
+        self._times = [log[0] for log in self.logs]
+        self._pending = []
+    
+    def _view(self, start_time, end_time, inclusive_end=True):
+        self._merge_pending()
+        lo = bisect_left(self._times, start_time)
+        if inclusive_end:
+            hi = bisect_right(self._times, end_time)
+        else:
+            hi = bisect_left(self._times, end_time)
+        return LogView(self.logs, lo, hi)
     
     def get_logs_by_date(self, target_date):
         """Get logs for a specific date"""
-        return [log for log in self.logs if log[0].date() == target_date]
+        day_start = datetime.combine(target_date, datetime.min.time())
+        return self._view(day_start, day_start + timedelta(days=1), inclusive_end=False)
     
     def get_logs_in_range(self, start_time, end_time):
         """Get logs in a time range"""
-        return [log for log in self.logs if start_time <= log[0] <= end_time]
+        return self._view(start_time, end_time)
     
     def get_recent_logs(self, hours=24):
         """Get logs from the last N hours"""
+        self._merge_pending()
         cutoff = datetime.now() - timedelta(hours=hours)
-        return [log for log in self.logs if log[0] >= cutoff]
+        return LogView(self.logs, bisect_left(self._times, cutoff), len(self.logs))
+    
+    def count_on_date(self, target_date):
+        """Number of logs on a date, in O(1)"""
+        return self.daily_counts[target_date]
+    
+    def count_in_hour(self, hour_start):
+        """Number of logs in the hour containing hour_start, in O(1)"""
+        return self.hourly_counts[hour_start.replace(minute=0, second=0, microsecond=0)]
+    
+    def hourly_histogram(self, target_date):
+        """Log counts for each of the 24 hours of a date"""
+        day_start = datetime.combine(target_date, datetime.min.time())
+        return [self.hourly_counts[day_start + timedelta(hours=h)] for h in range(24)]
 
 # Test log analyzer
 analyzer = LogAnalyzer()
@@ -346,47 +682,211 @@ analyzer.add_log("2024-01-15 10:00:00", "Application started")
 analyzer.add_log("2024-01-15 10:05:00", "User logged in")
 analyzer.add_log("2024-01-15 10:10:00", "Database connection established")
 analyzer.add_log("2024-01-15 11:00:00", "User logged out")
+analyzer.add_log("2024-01-15 09:55:00", "Config loaded")  # arrives out of order
 
 target_date = date(2024, 1, 15)
 logs_today = analyzer.get_logs_by_date(target_date)
 print(f"Logs for {target_date}: {len(logs_today)}")
+print(f"First log of the day: {logs_today[0][1]}")
+
+morning = analyzer.get_logs_in_range(datetime(2024, 1, 15, 10, 0), datetime(2024, 1, 15, 10, 30))
+print(f"Logs between 10:00 and 10:30: {[message for _, message in morning]}")
+print(f"Logs in the 10 o'clock hour: {analyzer.count_in_hour(datetime(2024, 1, 15, 10, 30))}")
+print(f"Hourly histogram (09-11h): {analyzer.hourly_histogram(target_date)[9:12]}")
 
 # Application 2: Event Scheduler
+import random
+
+class _IntervalNode:
+    """Treap node ordered by (start, id) and augmented with the subtree's max end"""
+    __slots__ = ('key', 'event', 'priority', 'max_end', 'left', 'right')
+    
+    def __init__(self, key, event):
+        self.key = key
+        self.event = event
+        self.priority = random.random()
+        self.max_end = event['end']
+        self.left = None
+        self.right = None
+    
+    def update(self):
+        max_end = self.event['end']
+        if self.left is not None and self.left.max_end > max_end:
+            max_end = self.left.max_end
+        if self.right is not None and self.right.max_end > max_end:
+            max_end = self.right.max_end
+        self.max_end = max_end
+
+class IntervalTree:
+    """Randomized balanced BST of events keyed by start time
+    
+    Each node also stores the latest end time in its subtree, so overlap
+    searches skip any subtree that finishes before the query starts.
+    Insert and delete are O(log n) expected; overlap queries are
+    O(log n + k) for k results.
+    """
+    
+    def __init__(self):
+        self.root = None
+        self.size = 0
+    
+    def __len__(self):
+        return self.size
+    
+    @staticmethod
+    def _split(node, key):
+        """Split into (< key, >= key) subtrees"""
+        if node is None:
+            return None, None
+        if node.key < key:
+            left, right = IntervalTree._split(node.right, key)
+            node.right = left
+            node.update()
+            return node, right
+        left, right = IntervalTree._split(node.left, key)
+        node.left = right
+        node.update()
+        return left, node
+    
+    @staticmethod
+    def _join(left, right):
+        """Join two subtrees where every key in left < every key in right"""
+        if left is None:
+            return right
+        if right is None:
+            return left
+        if left.priority > right.priority:
+            left.right = IntervalTree._join(left.right, right)
+            left.update()
+            return left
+        right.left = IntervalTree._join(left, right.left)
+        right.update()
+        return right
+    
+    def insert(self, key, event):
+        left, right = self._split(self.root, key)
+        self.root = self._join(self._join(left, _IntervalNode(key, event)), right)
+        self.size += 1
+    
+    def delete(self, key):
+        """Remove the node with this key; return True if it existed"""
+        parent, node = None, self.root
+        path = []
+        while node is not None and node.key != key:
+            path.append(node)
+            parent = node
+            node = node.left if key < node.key else node.right
+        if node is None:
+            return False
+        merged = self._join(node.left, node.right)
+        if parent is None:
+            self.root = merged
+        elif parent.left is node:
+            parent.left = merged
+        else:
+            parent.right = merged
+        for ancestor in reversed(path):
+            ancestor.update()
+        self.size -= 1
+        return True
+    
+    def overlapping(self, start, end):
+        """Yield events with event.start < end and event.end > start, in start order"""
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            # Go left while the left subtree can still hold an overlap
+            while node is not None and node.max_end > start:
+                stack.append(node)
+                node = node.left
+            if not stack:
+                return
+            node = stack.pop()
+            if node.key[0] >= end:
+                return  # everything further right starts too late
+            if node.event['end'] > start:
+                yield node.event
+            node = node.right
+    
+    def starting_between(self, start, end):
+        """Yield events with start <= event.start < end, in start order"""
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                if node.key[0] < start:
+                    node = node.right  # this node and its left subtree are too early
+                else:
+                    stack.append(node)
+                    node = node.left
+            if not stack:
+                return
+            node = stack.pop()
+            if node.key[0] >= end:
+                return
+            yield node.event
+            node = node.right
+
 class EventScheduler:
-    """Simple event scheduler"""
+    """Simple event scheduler backed by an interval tree"""
     
     def __init__(self):
-        self.events = []
+        self.events = {}        # id -> event
+        self.index = IntervalTree()
+        self._next_id = 0
     
     def add_event(self, name, start_time, duration_hours=1):
         """Add an event"""
         end_time = start_time + timedelta(hours=duration_hours)
-        self.events.append({
+        event = {
+            'id': self._next_id,
             'name': name,
             'start': start_time,
             'end': end_time,
             'duration': duration_hours
-        })
+        }
+        self._next_id += 1
+        self.events[event['id']] = event
+        self.index.insert((start_time, event['id']), event)
+        return event
+    
+    def remove_event(self, event):
+        """Remove an event (as returned by add_event)"""
+        if self.events.pop(event['id'], None) is None:
+            return False
+        return self.index.delete((event['start'], event['id']))
     
     def get_events_on_date(self, target_date):
         """Get events on a specific date"""
-        return [event for event in self.events if event['start'].date() == target_date]
+        day_start = datetime.combine(target_date, datetime.min.time())
+        return list(self.index.starting_between(day_start, day_start + timedelta(days=1)))
     
     def get_conflicting_events(self, start_time, duration_hours):
         """Check for conflicting events"""
         end_time = start_time + timedelta(hours=duration_hours)
-        conflicts = []
-        
-        for event in self.events:
-            if (start_time < event['end'] and end_time > event['start']):
-                conflicts.append(event)
-        
-        return conflicts
+        return list(self.index.overlapping(start_time, end_time))
     
     def get_upcoming_events(self, days=7):
         """Get upcoming events in the next N days"""
-        cutoff = datetime.now() + timedelta(days=days)
-        return [event for event in self.events if event['start'] <= cutoff and event['start'] >= datetime.now()]
+        now = datetime.now()
+        cutoff = now + timedelta(days=days)
+        return list(self.index.starting_between(now, cutoff + timedelta(microseconds=1)))
+    
+    def find_all_conflicts(self):
+        """Sweep-line pass returning every pair of overlapping events"""
+        ordered = sorted(self.events.values(), key=lambda event: (event['start'], event['id']))
+        active = []             # min-heap of (end, id, event) for events still running
+        conflicts = []
+        for event in ordered:
+            while active and active[0][0] <= event['start']:
+                heapq.heappop(active)
+            # Strict overlap both ways, as in IntervalTree.overlapping: a
+            # zero-length event starting with another one doesn't conflict
+            for _, _, other in active:
+                if other['start'] < event['end']:
+                    conflicts.append((other, event))
+            heapq.heappush(active, (event['end'], event['id'], event))
+        return conflicts
 
 # Test event scheduler
 scheduler = EventScheduler()
@@ -398,45 +898,253 @@ target_date = date(2024, 1, 15)
 events_today = scheduler.get_events_on_date(target_date)
 print(f"Events on {target_date}: {len(events_today)}")
 
+conflicts = scheduler.get_conflicting_events(datetime(2024, 1, 15, 12, 30), 2)
+print(f"Conflicts for 12:30-14:30: {[event['name'] for event in conflicts]}")
+
+review = scheduler.add_event("Review", datetime(2024, 1, 16, 12, 0, 0), 1)
+print(f"All conflicts: {[(a['name'], b['name']) for a, b in scheduler.find_all_conflicts()]}")
+scheduler.remove_event(review)
+print(f"After removing Review: {len(scheduler.find_all_conflicts())} conflicts")
+
 # Application 3: Data Backup Scheduler
+class TimerWheel:
+    """Hierarchical timer wheel (the scheme used by OS kernels)
+    
+    Time is cut into ticks of `resolution`. Level 0 has one slot per tick,
+    each higher level has slots `slots` times wider. Adding a timer is O(1);
+    when a lower level wraps around, the matching higher-level slot is
+    cascaded down. Timers past the top level wait in an overflow list.
+    """
+    
+    def __init__(self, start_time, resolution=timedelta(minutes=1), slots=64, levels=4):
+        self.epoch = start_time
+        self.resolution = resolution
+        self.slots = slots
+        self.levels = levels
+        self.current = 0            # current tick
+        self.wheels = [[[] for _ in range(slots)] for _ in range(levels)]
+        self.overflow = []
+        self.due = []               # timers added at or before the current tick
+        self.count = 0
+    
+    def _tick_of(self, when):
+        return -(-(when - self.epoch) // self.resolution)  # round up so timers never fire early
+    
+    def _place(self, entry):
+        delta = entry[0] - self.current
+        span = self.slots
+        for level in range(self.levels):
+            if delta < span:
+                slot = (entry[0] // (span // self.slots)) % self.slots
+                self.wheels[level][slot].append(entry)
+                return
+            span *= self.slots
+        self.overflow.append(entry)
+    
+    def add(self, when, item):
+        """Schedule item at datetime `when`; returns a handle for cancel()"""
+        entry = [self._tick_of(when), item, False]
+        if entry[0] <= self.current:
+            self.due.append(entry)
+        else:
+            self._place(entry)
+        self.count += 1
+        return entry
+    
+    def cancel(self, entry):
+        if not entry[2]:
+            entry[2] = True
+            self.count -= 1
+    
+    def advance(self, now):
+        """Move the wheel forward to `now` and return the items that expired"""
+        target = (now - self.epoch) // self.resolution
+        expired = []
+        for entry in self.due:
+            if not entry[2]:
+                entry[2] = True
+                self.count -= 1
+                expired.append(entry[1])
+        self.due = []
+        if self.count == 0:
+            self.current = max(self.current, target)
+            return expired
+        slots = self.slots
+        while self.current < target:
+            self.current += 1
+            # Cascade from the highest wrapped level down, so re-placed timers
+            # land in slots that are cascaded (or fired) later in this tick
+            width = 1
+            wrapped = []
+            for level in range(1, self.levels):
+                width *= slots
+                if self.current % width:
+                    break
+                wrapped.append((level, (self.current // width) % slots))
+            if len(wrapped) == self.levels - 1 and self.overflow:
+                pending, self.overflow = self.overflow, []
+                for entry in pending:
+                    self._place(entry)
+            for level, slot in reversed(wrapped):
+                bucket = self.wheels[level][slot]
+                self.wheels[level][slot] = []
+                for entry in bucket:
+                    if not entry[2]:
+                        self._place(entry)
+            bucket = self.wheels[0][self.current % slots]
+            self.wheels[0][self.current % slots] = []
+            for entry in bucket:
+                if not entry[2]:
+                    entry[2] = True
+                    self.count -= 1
+                    expired.append(entry[1])
+            if self.count == 0:
+                self.current = target
+        return expired
+    
+    def next_expiry(self):
+        """Datetime of the earliest pending timer's tick, or None
+        
+        Looks at the first non-empty slot of each level (and the overflow
+        list) rather than at every timer. The levels have to be compared:
+        a timer placed on level 0 long ago can be later than one that
+        reached level 1 recently.
+        """
+        if any(not entry[2] for entry in self.due):
+            return self.epoch + self.current * self.resolution
+        earliest = None
+        width = 1
+        for level in range(self.levels):
+            block = self.current // width
+            for k in range(1, self.slots + 1):
+                ticks = [entry[0] for entry in self.wheels[level][(block + k) % self.slots]
+                         if not entry[2]]
+                if ticks:
+                    earliest = min(ticks) if earliest is None else min(earliest, min(ticks))
+                    break
+            width *= self.slots
+        for entry in self.overflow:
+            if not entry[2] and (earliest is None or entry[0] < earliest):
+                earliest = entry[0]
+        return None if earliest is None else self.epoch + earliest * self.resolution
+
 class BackupScheduler:
-    """Schedule data backups"""
+    """Schedule data backups
     
-    def __init__(self):
+    Backups sit in a min-heap keyed by next_backup, so due backups come off
+    the top in O(log n). With use_timer_wheel=True a TimerWheel is used
+    instead, which keeps adds O(1) for very large numbers of jobs.
+    """
+    
+    def __init__(self, use_timer_wheel=False, resolution=timedelta(minutes=1)):
         self.backups = []
+        self.use_timer_wheel = use_timer_wheel
+        self._heap = []             # (next_backup, seq, backup)
+        self._seq = 0
+        self._wheel = TimerWheel(datetime.now(), resolution) if use_timer_wheel else None
+        self._ready = []            # wheel mode: expired but not yet run
     
-    def schedule_backup(self, name, frequency_days=7):
+    def _enqueue(self, backup):
+        if self._wheel is not None:
+            backup['handle'] = self._wheel.add(backup['next_backup'], backup)
+        else:
+            heapq.heappush(self._heap, (backup['next_backup'], self._seq, backup))
+            self._seq += 1
+    
+    def schedule_backup(self, name, frequency_days=7, action=None):
         """Schedule a backup"""
         last_backup = datetime.now() - timedelta(days=frequency_days)
         next_backup = last_backup + timedelta(days=frequency_days)
         
-        self.backups.append({
+        backup = {
             'name': name,
             'frequency_days': frequency_days,
             'last_backup': last_backup,
-            'next_backup': next_backup
-        })
+            'next_backup': next_backup,
+            'action': action
+        }
+        self.backups.append(backup)
+        self._enqueue(backup)
+        return backup
     
-    def get_due_backups(self):
+    def get_due_backups(self, now=None):
         """Get backups that are due"""
-        now = datetime.now()
-        return [backup for backup in self.backups if backup['next_backup'] <= now]
+        now = now or datetime.now()
+        if self._wheel is not None:
+            self._ready.extend(self._wheel.advance(now))
+            return list(self._ready)
+        # Walk only the part of the heap that is <= now: children of a
+        # not-due node can't be due either, so this costs O(k)
+        heap = self._heap
+        due = []
+        stack = [0] if heap else []
+        while stack:
+            i = stack.pop()
+            if heap[i][0] <= now:
+                due.append(heap[i][2])
+                stack.extend(child for child in (2 * i + 1, 2 * i + 2) if child < len(heap))
+        return sorted(due, key=lambda backup: backup['next_backup'])
+    
+    def _pop_due(self, now):
+        if self._wheel is not None:
+            due = self.get_due_backups(now)
+            self._ready = []
+            return due
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[2])
+        return due
+    
+    def run_pending(self, now=None):
+        """Run every due backup's action and schedule its next run"""
+        now = now or datetime.now()
+        fired = []
+        for backup in self._pop_due(now):
+            if backup['action'] is not None:
+                backup['action'](backup)
+            frequency = timedelta(days=backup['frequency_days'])
+            backup['last_backup'] = now
+            next_backup = backup['next_backup'] + frequency
+            if next_backup <= now:  # missed runs collapse into one
+                next_backup += frequency * ((now - next_backup) // frequency + 1)
+            backup['next_backup'] = next_backup
+            self._enqueue(backup)
+            fired.append(backup['name'])
+        return fired
+    
+    def next_run_time(self):
+        """When the earliest backup is due (None if nothing is scheduled)"""
+        if self._wheel is not None:
+            if self._ready:
+                return min(backup['next_backup'] for backup in self._ready)
+            return self._wheel.next_expiry()
+        return self._heap[0][0] if self._heap else None
+    
+    def run_forever(self, stop_event, max_sleep=60):
+        """Fire backups as they come due until stop_event (a threading.Event) is set"""
+        while not stop_event.is_set():
+            self.run_pending()
+            next_run = self.next_run_time()
+            wait = max_sleep if next_run is None else (next_run - datetime.now()).total_seconds()
+            stop_event.wait(min(max(wait, 0), max_sleep))
+    
+    @staticmethod
+    def _occurrences(backup, end_date):
+        current = backup['next_backup']
+        step = timedelta(days=backup['frequency_days'])
+        while current <= end_date:
+            yield {'name': backup['name'], 'date': current}
+            current += step
+    
+    def iter_backup_schedule(self, days=30):
+        """Lazily yield upcoming backup runs in date order"""
+        end_date = datetime.now() + timedelta(days=days)
+        return heapq.merge(*(self._occurrences(backup, end_date) for backup in self.backups),
+                           key=lambda run: run['date'])
     
     def get_backup_schedule(self, days=30):
         """Get backup schedule for the next N days"""
-        end_date = datetime.now() + timedelta(days=days)
-        schedule = []
-        
-        for backup in self.backups:
-            current = backup['next_backup']
-            while current <= end_date:
-                schedule.append({
-                    'name': backup['name'],
-                    'date': current
-                })
-                current += timedelta(days=backup['frequency_days'])
-        
-        return sorted(schedule, key=lambda x: x['date'])
+        return list(self.iter_backup_schedule(days))
 
 # Test backup scheduler
 backup_scheduler = BackupScheduler()
@@ -450,6 +1158,25 @@ print(f"Due backups: {len(due_backups)}")
 schedule = backup_scheduler.get_backup_schedule(14)
 print(f"Backup schedule (next 14 days): {len(schedule)}")
 
+next_three = [run['name'] for _, run in zip(range(3), backup_scheduler.iter_backup_schedule(365))]
+print(f"Next three runs: {next_three}")
+
+# Firing jobs: run_pending() runs actions and reschedules them
+fired = backup_scheduler.run_pending()
+print(f"Fired: {fired}")
+in_four_days = datetime.now() + timedelta(days=4)
+print(f"Fired 4 days later: {backup_scheduler.run_pending(in_four_days)}")
+
+# Timer wheel mode for very large job counts. Timers fire on tick
+# boundaries, so a job can run up to one resolution step late.
+wheel_scheduler = BackupScheduler(use_timer_wheel=True)
+for i in range(1000):
+    wheel_scheduler.schedule_backup(f"Job {i}", 1 + i % 10)
+soon = datetime.now() + timedelta(minutes=1)
+print(f"Wheel mode fired {len(wheel_scheduler.run_pending(soon))} jobs, "
+      f"then {len(wheel_scheduler.run_pending(soon + timedelta(days=2)))} two days later")
+print(f"Next wheel job due in {wheel_scheduler.next_run_time() - (soon + timedelta(days=2))}")
+
 # 13. Best Practices
 print("\n=== Best Practices ===")
 
@@ -472,6 +1199,113 @@ def convert_timezone(dt, target_tz):
         dt = dt.replace(tzinfo=timezone.utc)
     return dt.astimezone(target_tz)
 
+# Bulk timezone conversion
+# Converting millions of datetimes one at a time allocates millions of
+# objects. A zone's UTC offset only changes at a few transitions per
+# year, so we can record those once and convert plain epoch seconds
+# with a bisect per value.
+from zoneinfo import ZoneInfo
+
+class OffsetTable:
+    """UTC offset transitions of one zone over a span of epoch seconds"""
+    
+    SAMPLE_STEP = 6 * 3600      # offsets never change twice within 6 hours
+    
+    def __init__(self, tz):
+        self.tz = tz
+        self.start = self.end = None
+        self.transitions = array('q')   # epoch second where each offset starts
+        self.offsets = array('i')       # offset in seconds from that point on
+    
+    def _offset(self, ts):
+        return int(datetime.fromtimestamp(ts, self.tz).utcoffset().total_seconds())
+    
+    def cover(self, start, end):
+        """Make sure the table covers epoch seconds start..end"""
+        if self.start is not None and self.start <= start and end <= self.end:
+            return
+        if self.start is not None:
+            start, end = min(start, self.start), max(end, self.end)
+        transitions = array('q', [start])
+        offsets = array('i', [self._offset(start)])
+        ts = start
+        while ts < end:
+            nxt = min(ts + self.SAMPLE_STEP, end)
+            if self._offset(nxt) != offsets[-1]:
+                lo, hi = ts, nxt  # offset changes in (lo, hi]: bisect to the second
+                while hi - lo > 1:
+                    mid = (lo + hi) // 2
+                    if self._offset(mid) == offsets[-1]:
+                        lo = mid
+                    else:
+                        hi = mid
+                transitions.append(hi)
+                offsets.append(self._offset(hi))
+            ts = nxt
+        self.start, self.end = start, end
+        self.transitions, self.offsets = transitions, offsets
+    
+    def offsets_for(self, timestamps):
+        """UTC offsets (seconds) for an array of epoch timestamps"""
+        if not timestamps:
+            return array('i')
+        self.cover(min(timestamps), max(timestamps))
+        transitions, offsets = self.transitions, self.offsets
+        return array('i', [offsets[bisect_right(transitions, ts) - 1] for ts in timestamps])
+    
+    def local_offsets_for(self, local_seconds):
+        """UTC offsets for wall-clock seconds, resolved like datetime with fold=0
+        
+        Around a transition from offset a to offset b, wall times before
+        T + max(a, b) still use a: in a gap (b > a) the skipped times map
+        with the old offset, and in a fold (b < a) the repeated times take
+        their first occurrence.
+        """
+        if not local_seconds:
+            return array('i')
+        day = 86400     # no zone is more than a day away from UTC
+        self.cover(min(local_seconds) - day, max(local_seconds) + day)
+        transitions, offsets = self.transitions, self.offsets
+        thresholds = array('q', [transitions[0]])
+        for i in range(1, len(transitions)):
+            thresholds.append(transitions[i] + max(offsets[i - 1], offsets[i]))
+        return array('i', [offsets[max(0, bisect_right(thresholds, local) - 1)]
+                           for local in local_seconds])
+
+_offset_tables = {}
+
+def offset_table(tz):
+    """Cached OffsetTable for a tzinfo (or an IANA name like 'Europe/Paris')"""
+    if isinstance(tz, str):
+        tz = ZoneInfo(tz)
+    if tz not in _offset_tables:
+        _offset_tables[tz] = OffsetTable(tz)
+    return _offset_tables[tz]
+
+def epochs_to_local(timestamps, tz):
+    """Wall-clock seconds in tz for an array of UTC epoch timestamps"""
+    offsets = offset_table(tz).offsets_for(timestamps)
+    return array('q', [ts + off for ts, off in zip(timestamps, offsets)])
+
+def convert_timezone_many(local_seconds, from_tz, to_tz):
+    """Convert wall-clock seconds in from_tz to wall-clock seconds in to_tz
+    
+    Like datetime with fold=0, ambiguous or skipped local times during a
+    DST change resolve using the offset in effect just before it.
+    """
+    if not local_seconds:
+        return array('q')
+    offsets = offset_table(from_tz).local_offsets_for(local_seconds)
+    utc = array('q', [local - off for local, off in zip(local_seconds, offsets)])
+    return epochs_to_local(utc, to_tz)
+
+hourly = epoch_range(datetime(2024, 3, 9, tzinfo=timezone.utc), datetime(2024, 3, 11, tzinfo=timezone.utc), 3600)
+new_york = epochs_to_local(hourly, "America/New_York")
+print(f"NY offsets across the March DST change: "
+      f"{sorted({(local - utc) // 3600 for local, utc in zip(new_york, hourly)})} hours")
+tokyo = convert_timezone_many(new_york, "America/New_York", "Asia/Tokyo")
+print(f"First NY hour in Tokyo: {datetime.fromtimestamp(tokyo[0], timezone.utc).replace(tzinfo=None)}")
+
 # Best Practice 5: Use appropriate date formats
 def format_date_for_api(dt):
     """Format date for API consumption"""
@@ -557,20 +1391,23 @@ print(f"Age: {years} years, {months} months, {days} days")
 
 # 5. All Mondays in a month
 print("\nExercise 5: All Mondays in a Month")
-def mondays_in_month(year, month):
-    mondays = []
+def weekdays_in_month(year, month, weekday):
+    """All dates in a month falling on weekday (0=Monday, 6=Sunday)"""
+    days = []
     first_day = date(year, month, 1)
     
-    # Find first Monday
-    first_monday = next_weekday(first_day, 0)
+    # Find the first matching day (the 1st itself counts)
+    current = next_weekday(first_day - timedelta(days=1), weekday)
     
-    # Add all Mondays in the month
-    current = first_monday
+    # Add every matching day in the month
     while current.month == month:
-        mondays.append(current)
+        days.append(current)
         current += timedelta(days=7)
     
-    return mondays
+    return days
+
+def mondays_in_month(year, month):
+    return weekdays_in_month(year, month, 0)
 
 year = 2024
 month = 1
@@ -579,5 +1416,217 @@ print(f"Mondays in {calendar.month_name[month]} {year}:")
 for monday in mondays:
     print(f"  {monday}")
 
+# 14. Recurring Events
+print("\n=== Recurring Events ===")
+
+from collections import OrderedDict
+
+class RecurrenceRule:
+    """Daily, weekly or monthly repetition of an event start time
+    
+    Occurrences are computed on demand for a window, so a rule costs the
+    same to store whether it repeats ten times or forever.
+    
+    freq:       'daily', 'weekly' or 'monthly'
+    interval:   every N days/weeks/months
+    weekdays:   weekly rules: weekdays to repeat on (0=Monday)
+    nth_weekday: monthly rules: (weekday, n) for e.g. the 2nd Tuesday
+                 (n from -5 to 4, n=-1 means the last one); otherwise the
+                 start's day of month
+    until/count: optional end of the series (count=0 means no occurrences)
+    exceptions: dates to skip
+    """
+    
+    def __init__(self, freq, start, interval=1, weekdays=None, nth_weekday=None,
+                 until=None, count=None, exceptions=()):
+        if freq not in ('daily', 'weekly', 'monthly'):
+            raise ValueError(f"Unknown frequency: {freq}")
+        if nth_weekday is not None:
+            weekday, n = nth_weekday
+            if not 0 <= weekday <= 6 or not -5 <= n <= 4:
+                raise ValueError(f"Invalid nth_weekday: {nth_weekday}")
+        if count is not None and count < 0:
+            raise ValueError(f"count must be >= 0, got {count}")
+        self.freq = freq
+        self.start = start
+        self.interval = interval
+        self.weekdays = sorted(weekdays) if weekdays else [start.weekday()]
+        self.nth_weekday = nth_weekday
+        self.until = until
+        self.count = count
+        self.exceptions = set(exceptions)
+        if count:
+            # Turn a count into an end time once, so queries never have to
+            # walk from the start of the series
+            last = None
+            for last, _ in zip(self._candidates(start), range(count)):
+                pass
+            self.until = last
+    
+    def _candidates(self, window_start):
+        """Yield every rule date-time >= window_start, ignoring until/exceptions"""
+        window_start = max(window_start, self.start)
+        clock = self.start.time()
+        if self.freq == 'daily':
+            step = timedelta(days=self.interval)
+            skipped = (window_start - self.start) // step
+            current = self.start + skipped * step
+            while True:
+                if current >= window_start:
+                    yield current
+                current += step
+        elif self.freq == 'weekly':
+            # Weeks are counted from the Monday of the start's week
+            first_monday = self.start.date() - timedelta(days=self.start.weekday())
+            weeks = (window_start.date() - first_monday).days // 7
+            week = first_monday + timedelta(weeks=weeks - weeks % self.interval)
+            while True:
+                for weekday in self.weekdays:
+                    day = next_weekday(week - timedelta(days=1), weekday)
+                    current = datetime.combine(day, clock)
+                    if current >= window_start:
+                        yield current
+                week += timedelta(weeks=self.interval)
+        else:
+            months = (window_start.year - self.start.year) * 12 + window_start.month - self.start.month
+            months -= months % self.interval
+            # Rare matches (the 5th Monday of February) can be decades apart,
+            # but the Gregorian calendar repeats every 400 years (4800 months),
+            # so 4800 empty periods in a row mean the rule can never match again
+            empty_periods = 0
+            while empty_periods < 4800:
+                year, month = divmod(self.start.year * 12 + self.start.month - 1 + months, 12)
+                month += 1
+                if year >= date.max.year:
+                    return
+                if self.nth_weekday is not None:
+                    weekday, n = self.nth_weekday
+                    days = weekdays_in_month(year, month, weekday)
+                    day = days[n] if -len(days) <= n < len(days) else None
+                elif self.start.day <= calendar.monthrange(year, month)[1]:
+                    day = date(year, month, self.start.day)
+                else:
+                    day = None  # e.g. the 31st in a 30-day month
+                if day is None:
+                    empty_periods += 1
+                else:
+                    empty_periods = 0
+                    current = datetime.combine(day, clock)
+                    if current >= window_start:
+                        yield current
+                months += self.interval
+    
+    def occurrences(self, window_start, window_end):
+        """Lazily yield occurrence start times in [window_start, window_end)"""
+        if self.count == 0:
+            return
+        for current in self._candidates(window_start):
+            if current >= window_end or (self.until is not None and current > self.until):
+                return
+            if current.date() not in self.exceptions:
+                yield current
+
+class RecurringEventScheduler(EventScheduler):
+    """EventScheduler that also stores recurring events as rules
+    
+    Recurring events are expanded only for the window being queried. The
+    expansion of recent windows is cached and dropped whenever a rule
+    changes.
+    """
+    
+    def __init__(self, cache_size=64):
+        super().__init__()
+        self.rules = {}             # rule id -> (name, rule, duration_hours)
+        self.cache_size = cache_size
+        self._expansions = OrderedDict()
+        self._max_duration = timedelta(0)
+    
+    def _invalidate(self):
+        self._expansions.clear()
+    
+    def add_recurring_event(self, name, rule, duration_hours=1):
+        """Add a recurring event; returns its rule id"""
+        rule_id = self._next_id
+        self._next_id += 1
+        self.rules[rule_id] = (name, rule, duration_hours)
+        self._max_duration = max(self._max_duration, timedelta(hours=duration_hours))
+        self._invalidate()
+        return rule_id
+    
+    def remove_recurring_event(self, rule_id):
+        self.rules.pop(rule_id)
+        self._invalidate()
+    
+    def add_exception(self, rule_id, skipped_date):
+        """Cancel a single occurrence of a recurring event"""
+        self.rules[rule_id][1].exceptions.add(skipped_date)
+        self._invalidate()
+    
+    def expand(self, window_start, window_end):
+        """Occurrences of all recurring events starting in [window_start, window_end)"""
+        key = (window_start, window_end)
+        if key in self._expansions:
+            self._expansions.move_to_end(key)
+            return self._expansions[key]
+        occurrences = []
+        for rule_id, (name, rule, duration_hours) in self.rules.items():
+            for start in rule.occurrences(window_start, window_end):
+                occurrences.append({
+                    'id': None,
+                    'rule_id': rule_id,
+                    'name': name,
+                    'start': start,
+                    'end': start + timedelta(hours=duration_hours),
+                    'duration': duration_hours
+                })
+        occurrences.sort(key=lambda event: event['start'])
+        self._expansions[key] = occurrences
+        if len(self._expansions) > self.cache_size:
+            self._expansions.popitem(last=False)
+        return occurrences
+    
+    def get_events_on_date(self, target_date):
+        """Get single and recurring events on a specific date"""
+        day_start = datetime.combine(target_date, datetime.min.time())
+        events = super().get_events_on_date(target_date)
+        events += self.expand(day_start, day_start + timedelta(days=1))
+        return sorted(events, key=lambda event: event['start'])
+    
+    def get_conflicting_events(self, start_time, duration_hours):
+        """Check for conflicting single and recurring events"""
+        end_time = start_time + timedelta(hours=duration_hours)
+        conflicts = super().get_conflicting_events(start_time, duration_hours)
+        # An occurrence can only overlap if it starts less than the longest
+        # recurring duration before start_time
+        for event in self.expand(start_time - self._max_duration, end_time):
+            if event['end'] > start_time:
+                conflicts.append(event)
+        return sorted(conflicts, key=lambda event: event['start'])
+    
+    def get_upcoming_events(self, days=7):
+        """Get single and recurring events in the next N days"""
+        now = datetime.now()
+        events = super().get_upcoming_events(days)
+        events += self.expand(now, now + timedelta(days=days, microseconds=1))
+        return sorted(events, key=lambda event: event['start'])
+
+# Test recurring events
+calendar_scheduler = RecurringEventScheduler()
+standup = calendar_scheduler.add_recurring_event(
+    "Standup", RecurrenceRule('weekly', datetime(2024, 1, 1, 9, 30), weekdays=[0, 2, 4]), 0.25)
+calendar_scheduler.add_recurring_event(
+    "Planning", RecurrenceRule('monthly', datetime(2024, 1, 9, 14, 0), nth_weekday=(1, 1)), 2)
+calendar_scheduler.add_recurring_event(
+    "Backup window", RecurrenceRule('daily', datetime(2024, 1, 1, 23, 0), count=30), 1)
+calendar_scheduler.add_event("Offsite", datetime(2024, 3, 13, 9, 0), 8)
+
+print(f"Events on 2024-03-13: {[e['name'] for e in calendar_scheduler.get_events_on_date(date(2024, 3, 13))]}")
+print(f"Planning in 2024: {[e['start'].date().isoformat() for e in calendar_scheduler.expand(datetime(2024, 1, 1), datetime(2024, 5, 1)) if e['name'] == 'Planning']}")
+print(f"Conflicts at 2024-03-13 09:00: {[e['name'] for e in calendar_scheduler.get_conflicting_events(datetime(2024, 3, 13, 9, 0), 1)]}")
+calendar_scheduler.add_exception(standup, date(2024, 3, 13))
+print(f"After cancelling that standup: {[e['name'] for e in calendar_scheduler.get_conflicting_events(datetime(2024, 3, 13, 9, 0), 1)]}")
+in_ten_years = datetime(2034, 1, 1)
+print(f"Standups in the first week of 2034: {len(calendar_scheduler.expand(in_ten_years, in_ten_years + timedelta(days=7)))}")
+
 print("\n🎉 Congratulations! You've completed Lesson 19!")
 print("Next: Lesson 20 - Regular Expressions")
@@ -310,12 +310,154 @@ chained = chain_generators(gen1, gen2, gen3)
 print(f"Chained generators: {list(chained)}")
 
 # Pattern 2: Generator Tee (split generator)
-def tee_generator(gen, n=2):
-    """Split a generator into multiple generators"""
-    # This is a simplified version
-    items = list(gen)
-    for i in range(n):
-        yield iter(items)
+# Copying the whole source into a list defeats streaming. Instead the
+# branches share one buffer that only keeps items the slowest branch has
+# not consumed yet.
+import threading
+import time
+from collections import deque
+
+class TeeLagError(RuntimeError):
+    """A tee branch got more than max_lag items ahead of the slowest one"""
+
+class BoundedTee:
+    """Split an iterator into n branches with a bounded shared buffer
+    
+    max_lag=None keeps the buffer unbounded (like itertools.tee).
+    policy='block': a branch that gets max_lag items ahead waits for the
+                    others. Only useful when the branches are consumed from
+                    different threads; if the lagging branches were last
+                    read by the waiting thread itself, nothing could ever
+                    wake it, so TeeLagError is raised instead of hanging.
+                    A branch nobody has read yet may still be picked up by
+                    another thread, so that is waited for, but never for
+                    longer than wait_timeout seconds
+    policy='error': raise TeeLagError instead of waiting
+    """
+    
+    def __init__(self, iterable, n=2, max_lag=1000, policy='block', wait_timeout=30.0):
+        if policy not in ('block', 'error'):
+            raise ValueError(f"Unknown policy: {policy}")
+        self.source = iter(iterable)
+        self.max_lag = max_lag
+        self.policy = policy
+        self.wait_timeout = wait_timeout
+        self.buffer = deque()
+        self.base = 0               # source index of buffer[0]
+        self.positions = [0] * n    # next source index for each branch
+        self.active = [True] * n
+        self.owners = [None] * n    # thread that last read each branch
+        self.exhausted = False
+        self.max_buffered = 0
+        self.condition = threading.Condition()
+        self.branches = [TeeBranch(self, i) for i in range(n)]
+    
+    def _slowest(self):
+        positions = [pos for pos, active in zip(self.positions, self.active) if active]
+        return min(positions) if positions else self.base + len(self.buffer)
+    
+    def _trim(self):
+        slowest = self._slowest()
+        while self.buffer and self.base < slowest:
+            self.buffer.popleft()
+            self.base += 1
+        self.condition.notify_all()
+    
+    def _next(self, index):
+        with self.condition:
+            self.owners[index] = threading.get_ident()
+            pos = self.positions[index]
+            deadline = None
+            while pos >= self.base + len(self.buffer):
+                if self.exhausted:
+                    raise StopIteration
+                if self.max_lag is None or len(self.buffer) < self.max_lag:
+                    try:
+                        self.buffer.append(next(self.source))
+                    except StopIteration:
+                        self.exhausted = True
+                        self.condition.notify_all()
+                        raise
+                    self.max_buffered = max(self.max_buffered, len(self.buffer))
+                elif self.policy == 'error':
+                    raise TeeLagError(f"branch {index} is {self.max_lag} items ahead of the slowest branch")
+                else:
+                    lagging = [i for i, (p, active) in enumerate(zip(self.positions, self.active))
+                               if active and p == self.base]
+                    if all(self.owners[i] == self.owners[index] for i in lagging):
+                        raise TeeLagError(f"branch {index} is {self.max_lag} items ahead and the "
+                                          f"lagging branches are read by this same thread")
+                    if deadline is None:
+                        deadline = time.monotonic() + self.wait_timeout
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TeeLagError(f"branch {index} waited {self.wait_timeout}s for "
+                                          f"lagging branches {lagging}")
+                    self.condition.wait(remaining)
+            item = self.buffer[pos - self.base]
+            self.positions[index] = pos + 1
+            if pos == self.base:
+                self._trim()
+            return item
+    
+    def _close(self, index):
+        with self.condition:
+            self.active[index] = False
+            self._trim()
+
+class TeeBranch:
+    """One branch of a BoundedTee; safe to consume from its own thread"""
+    
+    def __init__(self, tee, index):
+        self.tee = tee
+        self.index = index
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        return self.tee._next(self.index)
+    
+    def close(self):
+        """Stop consuming so this branch no longer holds items in the buffer"""
+        self.tee._close(self.index)
+
+def tee_generator(gen, n=2, max_lag=None, policy='error'):
+    """Split a generator into multiple generators
+    
+    Unbounded by default, so one branch may be consumed completely before
+    the others. Pass max_lag to cap the buffer; with policy='error' a branch
+    that gets that far ahead raises TeeLagError, with policy='block' it
+    waits for branches read by other threads.
+    """
+    yield from BoundedTee(gen, n, max_lag, policy).branches
+
+# Branches consumed in lockstep only ever buffer one item
+left, right = tee_generator(range(10))
+print(f"Tee in lockstep: {[(a, b * b) for a, b in zip(left, right)][:4]}")
+
+# With the error policy, running too far ahead is reported
+fast, slow = tee_generator(range(100), max_lag=5, policy='error')
+try:
+    for _ in fast:
+        pass
+except TeeLagError as e:
+    print(f"TeeLagError: {e}")
+
+# Three threads fanning out one large stream never buffer more than max_lag
+tee = BoundedTee((i for i in range(100000)), n=3, max_lag=256)
+totals = [0, 0, 0]
+
+def consume(branch, slot):
+    for item in branch:
+        totals[slot] += item
+
+threads = [threading.Thread(target=consume, args=(branch, i)) for i, branch in enumerate(tee.branches)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+print(f"Thread sums: {totals}, most items buffered at once: {tee.max_buffered}")
 
 # Pattern 3: Generator Groupby
 def groupby_generator(iterable, key_func=None):
@@ -393,8 +535,6 @@ finally:
 # 10. Performance Considerations
 print("\n=== Performance Considerations ===")
 
-import time
-
 # Compare generator vs list for large datasets
 def generate_large_list(n):
     """Generate large list"""
@@ -536,10 +676,727 @@ print("Validation pipeline:")
 for item in pipeline:
     print(f"  {item}")
 
-# Cleanup
+# 13. Composable Pipelines
+print("\n=== Composable Pipelines ===")
+
+# Nesting calls like transform_data(filter_active(data_source())) gets
+# hard to read and every stage costs a generator hop per record. Pipeline
+# describes the stages declaratively and fuses runs of map/filter stages
+# into a single loop.
+class StageStats:
+    """Counters and timing for one pipeline stage"""
+    
+    def __init__(self, name):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.seconds = 0.0
+    
+    def __repr__(self):
+        return (f"{self.name}: in={self.items_in} out={self.items_out} "
+                f"time={self.seconds * 1000:.2f}ms")
+
+class Pipeline:
+    """Lazy, reusable chain of map/filter/flat_map/batch stages"""
+    
+    def __init__(self, stages=(), metrics=False):
+        self.stages = list(stages)      # (kind, function_or_size, name)
+        self.metrics = metrics
+        self.stats = []
+    
+    def _add(self, kind, arg, name):
+        name = name or f"{kind}:{getattr(arg, '__name__', arg)}"
+        return Pipeline(self.stages + [(kind, arg, name)], self.metrics)
+    
+    def map(self, func, name=None):
+        return self._add('map', func, name)
+    
+    def filter(self, predicate, name=None):
+        return self._add('filter', predicate, name)
+    
+    def flat_map(self, func, name=None):
+        return self._add('flat_map', func, name)
+    
+    def batch(self, size, name=None):
+        return self._add('batch', size, name)
+    
+    def parallel_map(self, func, name=None, **options):
+        """Run func in a worker pool; options are passed to parallel_map()"""
+        return self._add('parallel', (func, options), name or f"parallel:{func.__name__}")
+    
+    def with_metrics(self, enabled=True):
+        return Pipeline(self.stages, enabled)
+    
+    def _groups(self):
+        """Group adjacent map/filter stages so each group runs as one loop"""
+        groups = []
+        for kind, arg, name in self.stages:
+            if kind in ('map', 'filter') and groups and groups[-1][0] == 'fused':
+                groups[-1][1].append((kind, arg, name))
+            elif kind in ('map', 'filter'):
+                groups.append(('fused', [(kind, arg, name)]))
+            else:
+                groups.append((kind, (arg, name)))
+        return groups
+    
+    _fused_cache = {}
+    
+    @classmethod
+    def _fused(cls, items, ops):
+        """Run a group of map/filter stages as one generated loop
+        
+        The loop body is built as source code (the way namedtuple builds its
+        classes) so each stage is a plain call: no inner loop over stages
+        and no generator hop between them.
+        """
+        kinds = tuple(kind for kind, _, _ in ops)
+        if kinds not in cls._fused_cache:
+            lines = [f"def fused(items, {', '.join(f'f{i}' for i in range(len(kinds)))}):",
+                     "    for item in items:"]
+            for i, kind in enumerate(kinds):
+                if kind == 'map':
+                    lines.append(f"        item = f{i}(item)")
+                else:
+                    lines.append(f"        if not f{i}(item): continue")
+            lines.append("        yield item")
+            namespace = {}
+            exec("\n".join(lines), namespace)
+            cls._fused_cache[kinds] = namespace['fused']
+        return cls._fused_cache[kinds](items, *(func for _, func, _ in ops))
+    
+    @staticmethod
+    def _fused_with_stats(items, ops, stats):
+        ops = [(kind == 'map', func, stat) for (kind, func, _), stat in zip(ops, stats)]
+        clock = time.perf_counter
+        for item in items:
+            for is_map, func, stat in ops:
+                stat.items_in += 1
+                started = clock()
+                if is_map:
+                    item = func(item)
+                    stat.seconds += clock() - started
+                else:
+                    keep = func(item)
+                    stat.seconds += clock() - started
+                    if not keep:
+                        break
+                stat.items_out += 1
+            else:
+                yield item
+    
+    @staticmethod
+    def _flat_map(items, func, stat):
+        for item in items:
+            if stat is not None:
+                stat.items_in += 1
+            for result in func(item):
+                if stat is not None:
+                    stat.items_out += 1
+                yield result
+    
+    @staticmethod
+    def _batch(items, size, stat):
+        batch = []
+        for item in items:
+            if stat is not None:
+                stat.items_in += 1
+            batch.append(item)
+            if len(batch) == size:
+                if stat is not None:
+                    stat.items_out += 1
+                yield batch
+                batch = []
+        if batch:
+            if stat is not None:
+                stat.items_out += 1
+            yield batch
+    
+    def run(self, source):
+        """Apply the stages to an iterable, returning a lazy iterator"""
+        self.stats = []
+        if self.metrics:
+            for kind, arg, name in self.stages:
+                if kind == 'parallel':
+                    self.stats.append(ParallelStats(arg[1].get('workers', 4), name))
+                else:
+                    self.stats.append(StageStats(name))
+        stats = iter(self.stats)
+        items = iter(source)
+        for kind, payload in self._groups():
+            if kind == 'fused':
+                if self.metrics:
+                    items = self._fused_with_stats(items, payload, [next(stats) for _ in payload])
+                else:
+                    items = self._fused(items, payload)
+            elif kind == 'flat_map':
+                items = self._flat_map(items, payload[0], next(stats) if self.metrics else None)
+            elif kind == 'parallel':
+                func, options = payload[0]
+                items = parallel_map(func, items, stats=next(stats) if self.metrics else None, **options)
+            else:
+                items = self._batch(items, payload[0], next(stats) if self.metrics else None)
+        return items
+    
+    __call__ = run
+    
+    def __len__(self):
+        return len(self.stages)
+
+def _transform(record):
+    record["processed_value"] = record["value"] * 10
+    return record
+
+# The data_source -> filter_active -> transform_data pipeline from above
+active_pipeline = (Pipeline()
+                   .filter(lambda record: record["status"] == "active", name="active")
+                   .map(_transform, name="transform")
+                   .with_metrics())
+print("Pipeline results:")
+for record in active_pipeline.run(data_source()):
+    print(f"  {record}")
+for stat in active_pipeline.stats:
+    print(f"  {stat}")
+
+# flat_map and batch stages
+words = Pipeline().flat_map(str.split).map(str.upper).batch(4)
+print(f"Batched words: {list(words.run(['generators are lazy', 'pipelines fuse stages']))}")
+
+# Nested generators vs a fused 20-stage pipeline (same stage functions)
+def nested_stage(gen, func):
+    for x in gen:
+        yield func(x)
+
+def add_one(x):
+    return x + 1
+
+n = 200000
+start_time = time.time()
+nested = range(n)
+for _ in range(20):
+    nested = nested_stage(nested, add_one)
+total_nested = sum(nested)
+nested_time = time.time() - start_time
+
+fused = Pipeline()
+for _ in range(20):
+    fused = fused.map(add_one)
+start_time = time.time()
+total_fused = sum(fused.run(range(n)))
+fused_time = time.time() - start_time
+print(f"20 nested generators: {nested_time:.3f}s, fused pipeline: {fused_time:.3f}s "
+      f"(same result: {total_nested == total_fused})")
+
+# 14. Parallel Pipeline Stages
+print("\n=== Parallel Pipeline Stages ===")
+
+# Stages like process_chunk or transform_data run on the caller's thread.
+# parallel_map pulls items from a generator, sends them to a thread or
+# process pool in chunks and yields results, keeping only a bounded number
+# of chunks in flight so the input is never materialized.
 import os
-if os.path.exists("sample.txt"):
-    os.remove("sample.txt")
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+
+class ParallelStats:
+    """Queue depth and worker utilization of a parallel_map run"""
+    
+    def __init__(self, workers, name="parallel"):
+        self.name = name
+        self.workers = workers
+        self.chunks_submitted = 0
+        self.chunks_completed = 0
+        self.max_in_flight = 0
+        self.busy_seconds = 0.0     # time workers spent inside func
+        self.started = time.perf_counter()
+        self.finished = None
+    
+    @property
+    def in_flight(self):
+        return self.chunks_submitted - self.chunks_completed
+    
+    @property
+    def utilization(self):
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        return self.busy_seconds / (elapsed * self.workers) if elapsed else 0.0
+    
+    def __repr__(self):
+        return (f"{self.name}: chunks={self.chunks_completed}/{self.chunks_submitted} "
+                f"max_in_flight={self.max_in_flight} utilization={self.utilization:.0%}")
+
+def _apply_to_chunk(func, chunk):
+    """Worker side of parallel_map: run func over one chunk and time it"""
+    started = time.perf_counter()
+    results = [func(item) for item in chunk]
+    return results, time.perf_counter() - started
+
+def parallel_map(func, iterable, workers=4, use_processes=False, ordered=True,
+                 chunksize=16, max_in_flight=None, stats=None):
+    """Lazily yield func(item) for every item, computed in a worker pool
+    
+    With processes, func must be picklable (a module-level function).
+    Larger chunks amortize the pickling cost per item; max_in_flight
+    (default 2 * workers chunks) bounds memory and gives backpressure.
+    Pass a ParallelStats to observe queue depth and utilization.
+    """
+    max_in_flight = max_in_flight or 2 * workers
+    stats = stats if stats is not None else ParallelStats(workers)
+    items = iter(iterable)
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    executor = executor_class(max_workers=workers)
+    pending = deque() if ordered else set()
+    
+    def submit_more():
+        while stats.in_flight < max_in_flight:
+            chunk = list(islice(items, chunksize))
+            if not chunk:
+                return
+            future = executor.submit(_apply_to_chunk, func, chunk)
+            if ordered:
+                pending.append(future)
+            else:
+                pending.add(future)
+            stats.chunks_submitted += 1
+            stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+    
+    def collect(future):
+        results, busy = future.result()
+        stats.chunks_completed += 1
+        stats.busy_seconds += busy
+        return results
+    
+    try:
+        submit_more()
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                pending.difference_update(done)
+            for future in done:
+                results = collect(future)
+                submit_more()   # refill before handing results to the consumer
+                yield from results
+    finally:
+        # Runs on exhaustion, on errors and when the consumer stops early
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True, cancel_futures=True)
+        stats.finished = time.perf_counter()
+
+def cpu_heavy(n):
+    """Deliberately slow CPU-bound work"""
+    total = 0
+    for i in range(100000):
+        total += (n * i) % 7
+    return total
+
+start_time = time.time()
+serial = [cpu_heavy(n) for n in range(100)]
+serial_time = time.time() - start_time
+
+stats = ParallelStats(4)
+start_time = time.time()
+parallel = list(parallel_map(cpu_heavy, range(100), workers=4, use_processes=True,
+                             chunksize=10, stats=stats))
+parallel_time = time.time() - start_time
+print(f"Serial: {serial_time:.2f}s, 4 processes: {parallel_time:.2f}s on {os.cpu_count()} CPU(s), "
+      f"same order: {serial == parallel}")
+print(f"Process pool stats: {stats}")
+
+# As a pipeline stage between ordinary stages
+staged = (Pipeline()
+          .filter(lambda chunk: not chunk.endswith("3"))
+          .parallel_map(process_chunk, workers=2, chunksize=2)
+          .map(lambda chunk: chunk + "!")
+          .with_metrics())
+print(f"Parallel stage: {list(staged.run(f'chunk{i}' for i in range(6)))}")
+for stat in staged.stats:
+    print(f"  {stat}")
+
+# Stopping early cancels the remaining work
+for value in parallel_map(cpu_heavy, range(10 ** 9), workers=2):
+    break
+print(f"Stopped early after the first result: {value}")
+
+# 15. Async Streaming
+print("\n=== Async Streaming ===")
+
+# read_large_file blocks the event loop on every read. async_read_lines
+# does the blocking reads in a worker thread, one large block at a time,
+# and starts reading the next block while the current one is consumed.
+async def async_read_lines(filename, block_size=1 << 20, encoding="utf-8"):
+    """Asynchronously yield the lines of a file (without line endings)"""
+    file = await asyncio.to_thread(open, filename, "rb")
+    try:
+        pending = asyncio.ensure_future(asyncio.to_thread(file.read, block_size))
+        remainder = b""
+        while True:
+            block = await pending
+            if not block:
+                break
+            pending = asyncio.ensure_future(asyncio.to_thread(file.read, block_size))
+            lines = (remainder + block).split(b"\n")
+            remainder = lines.pop()
+            for line in lines:
+                yield line.rstrip(b"\r").decode(encoding)
+        if remainder:
+            yield remainder.rstrip(b"\r").decode(encoding)
+    finally:
+        if not pending.done():
+            pending.cancel()
+        await asyncio.to_thread(file.close)
+
+_DONE = object()
+
+async def amerge(*sources):
+    """Yield items from several async iterators as soon as any produces one"""
+    queue = asyncio.Queue(maxsize=len(sources) or 1)
+    
+    async def pump(source):
+        try:
+            async for item in source:
+                await queue.put((False, item))
+        except Exception as error:
+            await queue.put((True, error))
+        else:
+            # Not in a finally: once the consumer stops, a cancelled pump
+            # would wait forever on a full queue that nobody reads
+            await queue.put((False, _DONE))
+    
+    tasks = [asyncio.create_task(pump(source)) for source in sources]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            failed, item = await queue.get()
+            if failed:
+                raise item
+            if item is _DONE:
+                remaining -= 1
+            else:
+                yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def abatch(source, size, linger=None):
+    """Group an async iterator into lists of up to size items
+    
+    With linger (seconds), a partial batch is also emitted once its first
+    item has waited that long.
+    """
+    if linger is None:
+        batch = []
+        async for item in source:
+            batch.append(item)
+            if len(batch) == size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+        return
+    
+    queue = asyncio.Queue(maxsize=size)
+    
+    async def pump():
+        try:
+            async for item in source:
+                await queue.put(item)
+        finally:
+            await queue.put(_DONE)
+    
+    task = asyncio.create_task(pump())
+    loop = asyncio.get_running_loop()
+    try:
+        finished = False
+        while not finished:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            batch = [item]
+            deadline = loop.time() + linger
+            while len(batch) < size:
+                try:
+                    item = await asyncio.wait_for(queue.get(), max(0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+                if item is _DONE:
+                    finished = True
+                    break
+                batch.append(item)
+            yield batch
+        await task  # surfaces errors from the source
+    finally:
+        task.cancel()
+
+async def amap_concurrent(func, source, concurrency=10, ordered=True):
+    """Yield await func(item) for every item, running up to concurrency at once"""
+    pending = deque() if ordered else set()
+    iterator = source.__aiter__()
+    exhausted = False
+    
+    async def fill():
+        nonlocal exhausted
+        while not exhausted and len(pending) < concurrency:
+            try:
+                item = await iterator.__anext__()
+            except StopAsyncIteration:
+                exhausted = True
+                return
+            task = asyncio.ensure_future(func(item))
+            if ordered:
+                pending.append(task)
+            else:
+                pending.add(task)
+    
+    try:
+        await fill()
+        while pending:
+            if ordered:
+                result = await pending.popleft()
+                await fill()
+                yield result
+            else:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending.difference_update(done)
+                await fill()
+                for task in done:
+                    yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def async_streaming_example():
+    line_count = 0
+    async for line in async_read_lines("sample.txt", block_size=4096):
+        line_count += 1
+    print(f"Async reader counted {line_count} lines")
+    
+    async def ticker(name, count, delay):
+        for i in range(count):
+            await asyncio.sleep(delay)
+            yield f"{name}{i}"
+    
+    merged = [item async for item in amerge(ticker("a", 3, 0.03), ticker("b", 3, 0.05))]
+    print(f"Merged: {merged}")
+    
+    batches = [batch async for batch in abatch(async_read_lines("sample.txt"), 400)]
+    print(f"Batch sizes: {[len(batch) for batch in batches]}")
+    lingering = [batch async for batch in abatch(ticker("t", 5, 0.02), 10, linger=0.05)]
+    print(f"Linger batches: {lingering}")
+    
+    async def slow_length(line):
+        await asyncio.sleep(0.01)
+        return len(line)
+    
+    start = time.perf_counter()
+    lengths = [n async for n in amap_concurrent(slow_length, async_read_lines("sample.txt"), concurrency=100)]
+    print(f"map_concurrent: {len(lengths)} lines in {time.perf_counter() - start:.2f}s "
+          f"(sequential would take ~{len(lengths) * 0.01:.0f}s)")
+
+asyncio.run(async_streaming_example())
+
+# 16. Checkpointed Pipelines
+print("\n=== Checkpointed Pipelines ===")
+
+# A long generator chain restarts from zero after a crash. Periodically
+# saving how far the source has been read (plus any running state kept by
+# the stages) lets a restart seek straight back to that point.
+import json
+
+class CheckpointFile:
+    """Small JSON state file that is replaced atomically on every commit"""
+    
+    def __init__(self, path):
+        self.path = path
+    
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
+    def commit(self, state):
+        # Write a temp file, flush it to disk, then rename over the old
+        # file: a crash leaves either the old or the new state, never half
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        # The rename itself is only durable once the directory is synced
+        # (POSIX only: Windows can't open a directory as a file)
+        if os.name != "nt":
+            directory = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+            try:
+                os.fsync(directory)
+            finally:
+                os.close(directory)
+    
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+class ResumableLineSource:
+    """Lines of a file; each record carries the byte offset just after it"""
+    
+    def __init__(self, filename, offset=0, line_number=0):
+        self.filename = filename
+        self.offset = offset
+        self.line_number = line_number
+    
+    def __iter__(self):
+        with open(self.filename, "rb") as f:
+            f.seek(self.offset)
+            for raw in f:
+                self.offset += len(raw)
+                self.line_number += 1
+                yield {'line_number': self.line_number, 'content': raw.decode().strip(),
+                       'offset': self.offset}
+
+class LevelCounter:
+    """Example stateful stage: counts records per log level"""
+    
+    def __init__(self):
+        self.counts = {}
+    
+    def __call__(self, records):
+        for record in records:
+            level = record['content'].split(":")[0]
+            self.counts[level] = self.counts.get(level, 0) + 1
+            yield record
+    
+    def get_state(self):
+        return dict(self.counts)
+    
+    def set_state(self, state):
+        self.counts = dict(state)
+
+class CheckpointedPipeline:
+    """Run source -> stages -> sink, committing progress every `every` records
+    
+    stages are callables taking and returning an iterator (a Pipeline works);
+    those with get_state()/set_state() have their state saved too. Records
+    processed after the last commit are replayed on resume, so the sink
+    sees each record at least once.
+    
+    The pipeline tracks the source offset itself, so stages may reshape
+    or drop records freely (map, filter, flat_map, per-record stateful
+    stages). Commits happen when the stages ask the source for its next
+    record: at that point everything derived from earlier records has
+    reached the sink. Stages that read ahead, such as batch or
+    parallel_map, break that guarantee and would let the checkpoint skip
+    records that never reached the sink; they are rejected up front when
+    they come from a Pipeline, and caught at the sink when a record still
+    carries the source's 'offset'.
+    """
+    
+    def __init__(self, filename, state_path, stages, sink, every=1000):
+        for stage in stages:
+            if isinstance(stage, Pipeline):
+                read_ahead = [name for kind, _, name in stage.stages if kind in ('batch', 'parallel')]
+                if read_ahead:
+                    raise ValueError(f"stages {read_ahead} read ahead of the sink and "
+                                     f"can't be checkpointed exactly")
+        self.filename = filename
+        self.checkpoint = CheckpointFile(state_path)
+        self.stages = stages
+        self.sink = sink
+        self.every = every
+        self.records = 0
+    
+    def _commit(self, source):
+        self.checkpoint.commit({
+            'offset': source.offset,
+            'line_number': source.line_number,
+            'records': self.records,
+            'stages': [stage.get_state() if hasattr(stage, 'get_state') else None
+                       for stage in self.stages],
+        })
+    
+    def _feed(self, source):
+        committed = self.records
+        for record in source:
+            yield record
+            # Back here only when the stages want the next record, so every
+            # output of the records read so far has reached the sink
+            if self.records - committed >= self.every:
+                self._commit(source)
+                committed = self.records
+    
+    def _run(self, source):
+        items = self._feed(source)
+        for stage in self.stages:
+            items = stage(items)
+        for record in items:
+            offset = record.get('offset') if isinstance(record, dict) else None
+            if offset is not None and offset != source.offset:
+                # The source is past this record, so a commit now would skip
+                # whatever is still buffered inside the stages
+                raise ValueError(f"a stage read ahead of the sink (record at {offset}, "
+                                 f"source at {source.offset})")
+            self.sink(record)
+            self.records += 1
+        self._commit(source)
+        return self.records
+    
+    def run(self):
+        """Process the file from the beginning"""
+        self.records = 0
+        return self._run(ResumableLineSource(self.filename))
+    
+    def resume(self):
+        """Continue from the last committed checkpoint (or start fresh)"""
+        state = self.checkpoint.load()
+        if state is None:
+            return self.run()
+        for stage, stage_state in zip(self.stages, state['stages']):
+            if stage_state is not None:
+                stage.set_state(stage_state)
+        self.records = state['records']
+        return self._run(ResumableLineSource(self.filename, state['offset'], state['line_number']))
+
+# Build a log file and "crash" halfway through processing it
+with open("job.log", "w") as f:
+    for i in range(5000):
+        f.write(f"{['INFO', 'WARN', 'ERROR'][i % 3]}: event {i}\n")
+
+class SimulatedCrash(Exception):
+    pass
+
+written = []
+crash_pending = [True]
+
+def flaky_sink(record):
+    if record['line_number'] == 3210 and crash_pending[0]:
+        crash_pending[0] = False
+        raise SimulatedCrash("power cut")
+    written.append(record['line_number'])
+
+counter = LevelCounter()
+job = CheckpointedPipeline("job.log", "job.state",
+                           [Pipeline().filter(lambda r: r['content']), counter],
+                           flaky_sink, every=500)
+try:
+    job.run()
+except SimulatedCrash as e:
+    print(f"Crashed at line 3210 ({e}); last commit: {job.checkpoint.load()['line_number']} lines")
+
+# A fresh process would rebuild the objects and call resume()
+counter = LevelCounter()
+job = CheckpointedPipeline("job.log", "job.state",
+                           [Pipeline().filter(lambda r: r['content']), counter],
+                           flaky_sink, every=500)
+total = job.resume()
+print(f"Resumed and finished: {total} records, level counts {counter.counts}")
+print(f"Sink calls: {len(written)} ({len(written) - total} replayed from the last checkpoint)")
+job.checkpoint.clear()
+
+# Cleanup
+for filename in ("sample.txt", "job.log"):
+    if os.path.exists(filename):
+        os.remove(filename)
 
 # Exercises:
 """
@@ -555,22 +1412,101 @@ print("\n--- Exercise Solutions ---")
 
 # 1. Prime number generator
 print("Exercise 1: Prime Number Generator")
+# Trial division costs O(sqrt(n)) per number. A segmented Sieve of
+# Eratosthenes crosses off multiples in fixed-size bytearray windows
+# instead, so memory stays constant while the primes are produced lazily.
+# Only odd numbers are stored: index i stands for lo + 2*i.
+from array import array
+from itertools import compress
+
+def simple_sieve(limit):
+    """All primes < limit with a classic (non-segmented) sieve"""
+    if limit < 3:
+        return []
+    flags = bytearray([1]) * limit
+    flags[0] = flags[1] = 0
+    for p in range(2, int(limit ** 0.5) + 1):
+        if flags[p]:
+            flags[p * p::p] = bytes(len(range(p * p, limit, p)))
+    return list(compress(range(limit), flags))
+
+def sieve_segment(lo, hi, base_primes):
+    """Flags for the odd numbers in [lo, hi) (lo must be odd): 1 = prime"""
+    size = (hi - lo + 1) // 2
+    flags = bytearray([1]) * size
+    for p in base_primes:
+        if p == 2:
+            continue
+        square = p * p
+        if square >= hi:
+            break
+        start = max(square, (lo + p - 1) // p * p)
+        if start % 2 == 0:
+            start += p
+        first = (start - lo) // 2
+        if first < size:
+            flags[first::p] = bytes(len(range(first, size, p)))
+    if lo == 1:
+        flags[0] = 0    # 1 is not prime
+    return flags
+
+def segmented_primes(start=2, stop=None, segment_size=1 << 18):
+    """Yield primes in [start, stop) lazily; stop=None never ends"""
+    if start <= 2 and (stop is None or stop > 2):
+        yield 2
+    lo = max(start, 3) | 1                  # first odd candidate
+    base_limit = 0
+    base_primes = []
+    while stop is None or lo < stop:
+        hi = lo + 2 * segment_size
+        if stop is not None:
+            hi = min(hi, stop)
+        if base_limit * base_limit < hi:
+            # Grow the base primes (those up to sqrt(hi)) as the range grows
+            base_limit = max(2 * base_limit, int(hi ** 0.5) + 2)
+            base_primes = simple_sieve(base_limit)
+        yield from compress(range(lo, hi, 2), sieve_segment(lo, hi, base_primes))
+        lo = hi | 1
+
+def primes_in_range(a, b):
+    """List of primes p with a <= p < b"""
+    return list(segmented_primes(a, b))
+
+def _count_primes_in_range(bounds):
+    """Worker for parallel_primes_in_range: sieve one sub-range"""
+    a, b, count_only = bounds
+    primes = segmented_primes(a, b)
+    if count_only:
+        return sum(1 for _ in primes)
+    return array('q', primes)
+
+def parallel_primes_in_range(a, b, workers=4, count_only=False):
+    """Sieve [a, b) in parallel processes; returns a count or an array of primes"""
+    step = max(1, -(-(b - a) // (workers * 4)))
+    parts = [(lo, min(lo + step, b), count_only) for lo in range(a, b, step)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_count_primes_in_range, parts))
+    if count_only:
+        return sum(results)
+    primes = array('q')
+    for part in results:
+        primes.extend(part)
+    return primes
+
 def prime_generator(limit):
     """Generate prime numbers up to limit"""
-    def is_prime(n):
-        if n < 2:
-            return False
-        for i in range(2, int(n ** 0.5) + 1):
-            if n % i == 0:
-                return False
-        return True
-    
-    for num in range(2, limit):
-        if is_prime(num):
-            yield num
+    yield from segmented_primes(2, limit)
 
 primes = prime_generator(20)
 print(f"Primes up to 20: {list(primes)}")
+print(f"Primes in [1000000, 1000100): {primes_in_range(1000000, 1000100)}")
+first_big = next(segmented_primes(10 ** 12))
+print(f"First prime after 10^12: {first_big}")
+
+start_time = time.time()
+count = sum(1 for _ in segmented_primes(2, 10 ** 7))
+print(f"Primes below 10^7: {count} ({time.time() - start_time:.2f}s)")
+print(f"Primes below 10^6 (parallel): {parallel_primes_in_range(2, 10 ** 6, count_only=True)}")
 
 # 2. File line reader
 print("\nExercise 2: File Line Reader")
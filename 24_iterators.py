@@ -523,36 +523,138 @@ print(f"Iterator length: {len(sized_iter)}")
 print("\n=== Practical Iterator Examples ===")
 
 # Example 1: Database Result Iterator
+import sqlite3
+from array import array
+
 class DatabaseResultIterator:
-    """Iterator for database query results"""
-    
-    def __init__(self, query_results):
-        self.query_results = query_results
+    """Iterator over a live sqlite3 query, fetched in batches
+    
+    Rows are pulled with fetchmany(); the batch size adapts so each fetch
+    takes a few milliseconds. `columns` projects the query down to those
+    columns inside SQLite. mode is 'tuples', 'dicts' or 'columns' (the
+    last yields one dict of column -> array/list per batch). count() runs
+    a COUNT query for the number of rows, only when called; there is no
+    __len__, so list() doesn't trigger that extra scan.
+    """
+    
+    def __init__(self, conn, query, params=(), columns=None, mode='tuples',
+                 batch_size=64, max_batch_size=8192, target_seconds=0.005):
+        if mode not in ('tuples', 'dicts', 'columns'):
+            raise ValueError(f"Unknown mode: {mode}")
+        self.conn = conn
+        if columns:
+            quoted = ", ".join('"' + name.replace('"', '""') + '"' for name in columns)
+            query = f"SELECT {quoted} FROM ({query})"
+        self.query = query
+        self.params = params
+        self.mode = mode
+        self.batch_size = batch_size
+        self.max_batch_size = max_batch_size
+        self.target_seconds = target_seconds
+        self.cursor = None
+        self.column_names = None
+        self.batch = []
         self.index = 0
+        self._length = None
+        self._done = False      # exhausted or closed: keep raising StopIteration
     
     def __iter__(self):
         return self
     
+    def _fetch_batch(self):
+        if self._done:
+            return []
+        if self.cursor is None:
+            self.cursor = self.conn.execute(self.query, self.params)
+            self.column_names = [d[0] for d in self.cursor.description]
+        started = time.perf_counter()
+        rows = self.cursor.fetchmany(self.batch_size)
+        elapsed = time.perf_counter() - started
+        # Grow batches while fetches are cheap, shrink them if they get slow
+        if elapsed < self.target_seconds / 2:
+            self.batch_size = min(self.batch_size * 2, self.max_batch_size)
+        elif elapsed > self.target_seconds * 2:
+            self.batch_size = max(self.batch_size // 2, 1)
+        return rows
+    
+    @staticmethod
+    def _column_array(values):
+        if all(type(v) is int for v in values):
+            try:
+                return array('q', values)
+            except OverflowError:
+                return list(values)
+        if all(type(v) in (int, float) for v in values):
+            return array('d', values)
+        return list(values)
+    
     def __next__(self):
-        if self.index >= len(self.query_results):
-            raise StopIteration
+        if self.mode == 'columns':
+            rows = self._fetch_batch()
+            if not rows:
+                self.close()
+                raise StopIteration
+            return {name: self._column_array(values)
+                    for name, values in zip(self.column_names, zip(*rows))}
         
-        result = self.query_results[self.index]
+        if self.index >= len(self.batch):
+            self.batch = self._fetch_batch()
+            self.index = 0
+            if not self.batch:
+                self.close()
+                raise StopIteration
+        
+        result = self.batch[self.index]
         self.index += 1
+        if self.mode == 'dicts':
+            return dict(zip(self.column_names, result))
         return result
+    
+    def count(self):
+        """Number of rows the query returns (a separate COUNT query, cached)"""
+        if self._length is None:
+            self._length = self.conn.execute(f"SELECT COUNT(*) FROM ({self.query})",
+                                             self.params).fetchone()[0]
+        return self._length
+    
+    def close(self):
+        self._done = True
+        if self.cursor is not None:
+            self.cursor.close()
 
 # Simulate database results
-db_results = [
-    {"id": 1, "name": "Alice", "age": 25},
-    {"id": 2, "name": "Bob", "age": 30},
-    {"id": 3, "name": "Charlie", "age": 35}
-]
+db_conn = sqlite3.connect(":memory:")
+db_conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, age INTEGER)")
+db_conn.executemany("INSERT INTO users (name, age) VALUES (?, ?)",
+                    [("Alice", 25), ("Bob", 30), ("Charlie", 35)])
 
-db_iter = DatabaseResultIterator(db_results)
+db_iter = DatabaseResultIterator(db_conn, "SELECT * FROM users", mode='dicts')
 print("Database results:")
 for result in db_iter:
     print(f"User: {result['name']}, Age: {result['age']}")
 
+# A million-row result streams in constant memory
+import tracemalloc
+db_conn.execute("CREATE TABLE readings (id INTEGER PRIMARY KEY, sensor TEXT, value REAL)")
+db_conn.executemany("INSERT INTO readings (sensor, value) VALUES (?, ?)",
+                    ((f"s{i % 10}", i * 0.5) for i in range(1000000)))
+
+readings = DatabaseResultIterator(db_conn, "SELECT * FROM readings", columns=["value"])
+print(f"Rows (COUNT query): {readings.count()}")
+tracemalloc.start()
+total = sum(value for (value,) in readings)
+peak = tracemalloc.get_traced_memory()[1]
+tracemalloc.stop()
+print(f"Sum of values: {total:.0f}, peak memory {peak / 1024:.0f} KiB, "
+      f"final batch size {readings.batch_size}")
+
+column_batches = DatabaseResultIterator(db_conn, "SELECT id, value FROM readings WHERE id <= 5000",
+                                        mode='columns')
+first_batch = next(column_batches)
+print(f"Column batch: id {first_batch['id'].typecode!r} x{len(first_batch['id'])}, "
+      f"value {first_batch['value'].typecode!r}")
+column_batches.close()
+
 # Example 2: File Processing Iterator
 class FileProcessorIterator:
     """Iterator for processing file chunks"""
@@ -591,16 +693,30 @@ for i, chunk in enumerate(file_iter):
     print(f"Chunk {i}: {chunk.decode('utf-8')[:20]}...")
 
 # Example 3: API Response Iterator
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 class APIResponseIterator:
-    """Iterator for API responses with pagination"""
+    """Iterator for API responses with pagination
+    
+    With prefetch=K, the next K pages are requested in background threads
+    while the current page is consumed, so iteration doesn't stall on
+    every page boundary. Call close() (or use `with`) when stopping early.
+    `async for` works too, fetching pages as asyncio tasks.
+    """
     
-    def __init__(self, api_client, endpoint):
+    def __init__(self, api_client, endpoint, prefetch=0):
         self.api_client = api_client
         self.endpoint = endpoint
+        self.prefetch = prefetch
         self.page = 1
         self.current_data = []
         self.data_index = 0
         self.has_more = True
+        self._executor = None
+        self._pending = deque()     # (page, future or task) requested ahead
+        self._next_request = 1      # next page number to request
     
     def __iter__(self):
         return self
@@ -611,9 +727,10 @@ class APIResponseIterator:
         
         # Load new page if needed
         if self.data_index >= len(self.current_data):
-            self.current_data = self._fetch_page(self.page)
+            self.current_data = self._next_page()
             if not self.current_data:
                 self.has_more = False
+                self.close()
                 raise StopIteration
             self.page += 1
             self.data_index = 0
@@ -624,22 +741,126 @@ class APIResponseIterator:
         return item
     
     def _fetch_page(self, page):
-        """Simulate API call"""
-        # Simulate API response
-        if page <= 3:
-            return [f"Item {page}-{i}" for i in range(1, 4)]
-        return []
+        """Call the API for one page"""
+        return self.api_client.get(self.endpoint, page)
+    
+    def _next_page(self):
+        if not self.prefetch:
+            return self._fetch_page(self.page)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.prefetch)
+        # Keep up to `prefetch` requests in flight; memory stays bounded
+        while len(self._pending) < self.prefetch:
+            page = self._next_request
+            self._pending.append((page, self._executor.submit(self._fetch_page, page)))
+            self._next_request += 1
+        _, future = self._pending.popleft()
+        return future.result()
+    
+    def close(self):
+        """Cancel outstanding page requests"""
+        for _, request in self._pending:
+            request.cancel()
+        self._pending.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self.has_more = False
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+    
+    def __del__(self):
+        self.close()
+    
+    # Async variant
+    async def _afetch_page(self, page):
+        if hasattr(self.api_client, "aget"):
+            return await self.api_client.aget(self.endpoint, page)
+        return await asyncio.to_thread(self._fetch_page, page)
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self):
+        if not self.has_more:
+            raise StopAsyncIteration
+        if self.data_index >= len(self.current_data):
+            while len(self._pending) < max(self.prefetch, 1):
+                page = self._next_request
+                self._pending.append((page, asyncio.ensure_future(self._afetch_page(page))))
+                self._next_request += 1
+            _, task = self._pending.popleft()
+            self.current_data = await task
+            if not self.current_data:
+                self.close()
+                raise StopAsyncIteration
+            self.page += 1
+            self.data_index = 0
+        item = self.current_data[self.data_index]
+        self.data_index += 1
+        return item
 
 # Use API response iterator
 class MockAPIClient:
+    """Local stand-in for a paginated API with simulated latency"""
+    
+    def __init__(self, pages=3, page_size=3, latency=0.0):
+        self.pages = pages
+        self.page_size = page_size
+        self.latency = latency
+        self.calls = 0
+    
     def get(self, endpoint, page):
-        return f"API call to {endpoint}, page {page}"
+        self.calls += 1
+        time.sleep(self.latency)
+        if page <= self.pages:
+            return [f"Item {page}-{i}" for i in range(1, self.page_size + 1)]
+        return []
+    
+    async def aget(self, endpoint, page):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if page <= self.pages:
+            return [f"Item {page}-{i}" for i in range(1, self.page_size + 1)]
+        return []
 
 api_iter = APIResponseIterator(MockAPIClient(), "/users")
 print("API responses:")
 for item in api_iter:
     print(f"API item: {item}")
 
+# Benchmark: 20 pages with 20ms latency each, consumer does a little work
+def consume(iterator):
+    start = time.time()
+    count = 0
+    for item in iterator:
+        time.sleep(0.001)   # per-item processing
+        count += 1
+    return count, time.time() - start
+
+count, plain_time = consume(APIResponseIterator(MockAPIClient(20, 10, 0.02), "/export"))
+with APIResponseIterator(MockAPIClient(20, 10, 0.02), "/export", prefetch=4) as prefetching:
+    count, prefetch_time = consume(prefetching)
+print(f"{count} items: {plain_time:.2f}s without prefetch, {prefetch_time:.2f}s with prefetch=4")
+
+# Stopping early cancels the pages requested ahead
+client = MockAPIClient(100, 10, 0.01)
+with APIResponseIterator(client, "/export", prefetch=4) as early:
+    first = next(early)
+print(f"Stopped after {first!r}; pages requested: {client.calls}")
+
+async def async_api_example():
+    items = [item async for item in APIResponseIterator(MockAPIClient(20, 10, 0.02), "/export", prefetch=4)]
+    return len(items)
+
+start_time = time.time()
+print(f"Async prefetch: {asyncio.run(async_api_example())} items in {time.time() - start_time:.2f}s")
+
 # 11. Iterator Testing
 print("\n=== Iterator Testing ===")
 
@@ -721,24 +942,84 @@ for key, value in config_iter:
     print(f"  {key}: {value}")
 
 # Example 2: Log Entry Iterator
+from datetime import datetime, timedelta
+
 class LogEntryIterator:
-    """Iterator for log entries"""
+    """Iterator for log entries that start with 'YYYY-MM-DD HH:MM:SS'
     
-    def __init__(self, log_file):
+    For a time-ordered log, seek_time() binary-searches byte offsets for
+    the first entry at or after a timestamp, so only a few lines are read
+    no matter how large the file is. start/end restrict iteration to the
+    [start, end) window. line_number counts from where reading began.
+    """
+    
+    def __init__(self, log_file, start=None, end=None):
         self.log_file = log_file
+        self.start = start
+        self.end = end
         self.file = None
         self.line_number = 0
+        self.bytes_examined = 0     # bytes read while seeking
+    
+    @staticmethod
+    def parse_timestamp(raw):
+        """Leading timestamp of a raw log line, or None"""
+        try:
+            return datetime.fromisoformat(raw[:19].decode())
+        except (ValueError, UnicodeDecodeError):
+            return None
+    
+    def _entry_at_or_after(self, pos):
+        """(offset, timestamp) of the first timestamped line starting at or after pos"""
+        f = self.file
+        if pos > 0:
+            f.seek(pos - 1)
+            skipped = f.readline()  # finish the line pos falls inside
+            self.bytes_examined += len(skipped)
+        else:
+            f.seek(0)
+        while True:
+            offset = f.tell()
+            raw = f.readline()
+            self.bytes_examined += len(raw)
+            if not raw:
+                return None, None
+            timestamp = self.parse_timestamp(raw)
+            if timestamp is not None:   # skip continuation lines (e.g. tracebacks)
+                return offset, timestamp
+    
+    def seek_time(self, target):
+        """Position the iterator at the first entry with timestamp >= target"""
+        if self.file is None:
+            self.file = open(self.log_file, 'rb')
+        lo, hi = 0, os.path.getsize(self.log_file)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset, timestamp = self._entry_at_or_after(mid)
+            if offset is None or timestamp >= target:
+                hi = mid
+            else:
+                lo = mid + 1
+        offset, _ = self._entry_at_or_after(lo)
+        self.file.seek(offset if offset is not None else os.path.getsize(self.log_file))
+        self.line_number = 0
+        return self
     
     def __iter__(self):
-        self.file = open(self.log_file, 'r')
+        if self.file is None:
+            self.file = open(self.log_file, 'rb')
+            if self.start is not None:
+                self.seek_time(self.start)
         return self
     
     def __next__(self):
         if self.file is None:
             raise StopIteration
         
+        offset = self.file.tell()
         line = self.file.readline()
-        if not line:
+        timestamp = self.parse_timestamp(line)
+        if not line or (self.end is not None and timestamp is not None and timestamp >= self.end):
             self.file.close()
             self.file = None
             raise StopIteration
@@ -746,22 +1027,216 @@ class LogEntryIterator:
         self.line_number += 1
         return {
             'line_number': self.line_number,
-            'content': line.strip(),
-            'timestamp': f"2024-01-15 {self.line_number:02d}:00:00"
+            'offset': offset,
+            'content': line.decode().strip(),
+            'timestamp': timestamp
         }
 
+# Build a time-ordered log: one entry every 10 seconds for ~11.5 days
+import os
+log_start = datetime(2024, 1, 15)
+with open("app.log", "w") as f:
+    for i in range(100000):
+        stamp = log_start + timedelta(seconds=10 * i)
+        f.write(f"{stamp:%Y-%m-%d %H:%M:%S} [INFO] request {i} handled\n")
+        if i % 1000 == 0:
+            f.write("    traceback line without a timestamp\n")
+
 # Use log entry iterator
-log_iter = LogEntryIterator("test_chunks.txt")
+log_iter = LogEntryIterator("app.log")
 print("Log entries:")
 for i, entry in enumerate(log_iter):
     if i < 3:  # Show first 3 entries
         print(f"  {entry}")
     else:
         break
+log_iter.file.close()
+
+# The last hour of the log, reading only the bytes needed to find it
+last_hour_start = log_start + timedelta(seconds=10 * 99999) - timedelta(hours=1)
+last_hour = LogEntryIterator("app.log", start=last_hour_start)
+entries = list(last_hour)
+print(f"Last hour: {len(entries)} entries from {entries[0]['timestamp']}, "
+      f"found after examining {last_hour.bytes_examined} of {os.path.getsize('app.log')} bytes")
+
+window = LogEntryIterator("app.log", start=datetime(2024, 1, 20, 12, 0), end=datetime(2024, 1, 20, 12, 1))
+print(f"Entries in [12:00, 12:01) on Jan 20: {[e['content'][20:] for e in window]}")
+
+# 13. Indexed File Access
+print("\n=== Indexed File Access ===")
+
+# Iterators over files can only move forward, so reaching line N means
+# reading N lines. A sparse index stores the byte offset of every Kth line
+# (8 bytes each in an array('Q')), built once in a single pass. Line N is
+# then one seek plus at most K-1 skipped lines.
+import os
+from array import array
+
+class LineOffsetIndex:
+    """Random access to the lines of a text file through sampled offsets"""
+    
+    HEADER = 4  # every, line_count, file size, mtime_ns
+    
+    def __init__(self, filename, every=64):
+        self.filename = filename
+        self.every = every
+        self.offsets = array('Q')
+        self.line_count = 0
+    
+    @classmethod
+    def build(cls, filename, every=64):
+        """Scan the file once, recording where every Kth line starts"""
+        index = cls(filename, every)
+        offsets = index.offsets
+        offset = 0
+        line_count = 0
+        with open(filename, 'rb') as f:
+            for raw in f:
+                if line_count % every == 0:
+                    offsets.append(offset)
+                offset += len(raw)
+                line_count += 1
+        index.line_count = line_count
+        return index
+    
+    def _signature(self):
+        stat = os.stat(self.filename)
+        return [self.every, self.line_count, stat.st_size, stat.st_mtime_ns]
+    
+    def save(self, sidecar=None):
+        """Write the index next to the file (default: filename + '.idx')"""
+        sidecar = sidecar or self.filename + ".idx"
+        # Write aside and rename, so readers never see a half-written index
+        temp_path = sidecar + ".tmp"
+        with open(temp_path, 'wb') as f:
+            array('Q', self._signature()).tofile(f)
+            self.offsets.tofile(f)
+        os.replace(temp_path, sidecar)
+    
+    @classmethod
+    def load_or_build(cls, filename, every=64, sidecar=None):
+        """Reuse a saved sidecar if the file hasn't changed, else rebuild it"""
+        sidecar = sidecar or filename + ".idx"
+        try:
+            with open(sidecar, 'rb') as f:
+                header = array('Q')
+                header.fromfile(f, cls.HEADER)
+                index = cls(filename, header[0])
+                index.line_count = header[1]
+                if list(header) == index._signature() and header[0] == every:
+                    index.offsets.frombytes(f.read())
+                    if len(index.offsets) == -(-index.line_count // every):
+                        return index
+        except (FileNotFoundError, EOFError, ValueError):
+            pass    # missing, stale or truncated sidecar: rebuild it
+        index = cls.build(filename, every)
+        index.save(sidecar)
+        return index
+    
+    def __len__(self):
+        return self.line_count
+    
+    def _open_at(self, line_number):
+        """Open the file positioned at the start of line_number"""
+        f = open(self.filename, 'rb')
+        if line_number >= self.line_count:
+            f.seek(0, os.SEEK_END)      # past the last line: nothing to read
+            return f
+        f.seek(self.offsets[line_number // self.every])
+        for _ in range(line_number % self.every):
+            f.readline()
+        return f
+    
+    def iter_lines(self, start=0, stop=None):
+        """Yield lines start..stop-1 (stripped), reading only that range"""
+        stop = self.line_count if stop is None else min(stop, self.line_count)
+        if start >= stop:
+            return
+        with self._open_at(start) as f:
+            for _ in range(stop - start):
+                yield f.readline().decode().rstrip("\r\n")
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            wanted = range(*index.indices(self.line_count))
+            if not wanted:
+                return []
+            # Read the covered lines forwards once, then pick in slice order
+            # (which also handles a negative step)
+            first = min(wanted[0], wanted[-1])
+            lines = list(self.iter_lines(first, max(wanted[0], wanted[-1]) + 1))
+            return [lines[i - first] for i in wanted]
+        if index < 0:
+            index += self.line_count
+        if not 0 <= index < self.line_count:
+            raise IndexError("line index out of range")
+        return next(self.iter_lines(index, index + 1))
+    
+    def split(self, parts):
+        """Split the file into `parts` line ranges for parallel readers"""
+        if self.line_count == 0:
+            return []
+        size = -(-self.line_count // parts)
+        return [(start, min(start + size, self.line_count))
+                for start in range(0, self.line_count, size)]
+
+class IndexedFileLineIterator(FileLineIterator):
+    """FileLineIterator that starts at any line, using a LineOffsetIndex"""
+    
+    def __init__(self, index, start_line=0):
+        super().__init__(index.filename)
+        self.index = index
+        self.start_line = start_line
+    
+    def __iter__(self):
+        self.file = self.index._open_at(self.start_line)
+        return self
+    
+    def __next__(self):
+        line = super().__next__()
+        return line.decode()
+
+# Build a larger file to page through
+with open("big_file.txt", "w") as f:
+    for i in range(200000):
+        f.write(f"Record {i}: {'x' * (i % 50)}\n")
+
+start_time = time.time()
+line_index = LineOffsetIndex.load_or_build("big_file.txt", every=64)
+print(f"Indexed {len(line_index)} lines in {time.time() - start_time:.3f}s "
+      f"({len(line_index.offsets) * line_index.offsets.itemsize} bytes of offsets)")
+print(f"Line 150000: {line_index[150000][:20]}")
+print(f"Page 3000 (50 lines/page): {[line[:13] for line in line_index[150000:150050]][:3]} ...")
+
+start_time = time.time()
+for n in range(0, 200000, 2000):
+    line_index[n]
+indexed_time = time.time() - start_time
+start_time = time.time()
+for n in range(0, 200000, 20000):
+    with open("big_file.txt") as f:
+        for i, line in enumerate(f):
+            if i == n:
+                break
+scan_time = (time.time() - start_time) * 10
+print(f"100 random lookups: indexed {indexed_time:.3f}s vs sequential scan ~{scan_time:.2f}s")
+
+tail = IndexedFileLineIterator(line_index, start_line=199998)
+print(f"Last lines via IndexedFileLineIterator: {[line[:13] for line in tail]}")
+
+# Parallel readers each start at their own line
+from concurrent.futures import ThreadPoolExecutor
+
+def count_chars(line_range):
+    return sum(len(line) for line in line_index.iter_lines(*line_range))
+
+with ThreadPoolExecutor(max_workers=4) as executor:
+    total_chars = sum(executor.map(count_chars, line_index.split(4)))
+print(f"Characters counted by 4 readers: {total_chars}")
 
 # Cleanup
 import os
-files_to_remove = ["test_file.txt", "test_chunks.txt"]
+files_to_remove = ["test_file.txt", "test_chunks.txt", "app.log", "big_file.txt", "big_file.txt.idx"]
 for file in files_to_remove:
     if os.path.exists(file):
         os.remove(file)
@@ -780,33 +1255,53 @@ print("\n--- Exercise Solutions ---")
 
 # 1. Prime number iterator
 print("Exercise 1: Prime Number Iterator")
+from itertools import compress
+
 class PrimeIterator:
-    def __init__(self, limit):
+    """Primes below limit, sieved one bytearray segment at a time"""
+    
+    def __init__(self, limit, segment_size=1 << 16):
         self.limit = limit
-        self.current = 2
+        self.segment_size = segment_size
+        self.low = 2                # start of the next segment to sieve
+        self.segment = iter(())     # primes of the current segment
+        self.base_primes = self._small_primes(int(limit ** 0.5) + 1)
     
     def __iter__(self):
         return self
     
     def __next__(self):
-        while self.current < self.limit:
-            if self._is_prime(self.current):
-                prime = self.current
-                self.current += 1
+        while True:
+            for prime in self.segment:
                 return prime
-            self.current += 1
-        raise StopIteration
-    
-    def _is_prime(self, n):
-        if n < 2:
-            return False
-        for i in range(2, int(n ** 0.5) + 1):
-            if n % i == 0:
-                return False
-        return True
+            if self.low >= self.limit:
+                raise StopIteration
+            self._sieve_next_segment()
+    
+    def _sieve_next_segment(self):
+        low = self.low
+        high = min(low + self.segment_size, self.limit)
+        flags = bytearray([1]) * (high - low)
+        for p in self.base_primes:
+            if p * p >= high:
+                break
+            start = max(p * p, (low + p - 1) // p * p)
+            flags[start - low::p] = bytes(len(range(start - low, high - low, p)))
+        self.segment = compress(range(low, high), flags)
+        self.low = high
+    
+    @staticmethod
+    def _small_primes(limit):
+        flags = bytearray([1]) * max(limit, 2)
+        flags[0] = flags[1] = 0
+        for p in range(2, int(limit ** 0.5) + 1):
+            if flags[p]:
+                flags[p * p::p] = bytes(len(range(p * p, limit, p)))
+        return list(compress(range(limit), flags))
 
 prime_iter = PrimeIterator(20)
 print(f"Primes up to 20: {list(prime_iter)}")
+print(f"Primes below 1,000,000: {sum(1 for _ in PrimeIterator(10 ** 6))}")
 
 # 2. File line iterator
 print("\nExercise 2: File Line Iterator")
@@ -191,7 +191,11 @@ asyncio.run(async_file_operations())
 
 # Async network operations
 async def async_network_example():
-    import aiohttp
+    try:
+        import aiohttp
+    except ImportError:
+        print("Network example (aiohttp not installed)")
+        return
     
     async def fetch_url(session, url):
         try:
@@ -207,7 +211,7 @@ async def async_network_example():
     #     results = await asyncio.gather(*tasks)
     #     print(f"Network results: {results}")
     
-    print("Network example (aiohttp not installed)")
+    print("Network example (aiohttp available, session block left commented out)")
 
 asyncio.run(async_network_example())
 
@@ -343,6 +347,129 @@ async def producer_consumer_pattern():
 
 asyncio.run(producer_consumer_pattern())
 
+# Batched variant: items move in lists, one wake-up per batch
+from collections import deque
+
+class AsyncBatchQueue:
+    """asyncio FIFO with put_many/get_batch, lingering and backpressure metrics
+    
+    asyncio.Queue wakes a getter future per item; here a producer appends a
+    whole list and a consumer takes up to max_n items in one step. close()
+    ends the stream: consumers drain what is left, then get [].
+    """
+    
+    def __init__(self, maxsize=0):
+        self.maxsize = maxsize
+        self._items = deque()
+        self._changed = asyncio.Condition()
+        self._closed = False
+        self.high_watermark = 0
+        self.put_blocked = 0.0
+        self.get_blocked = 0.0
+        self.items_in = 0
+        self.batches_out = 0
+    
+    async def put(self, item):
+        await self.put_many((item,))
+    
+    async def put_many(self, items):
+        items = list(items)
+        async with self._changed:
+            while items:
+                if self._closed:
+                    raise ValueError("put on a closed AsyncBatchQueue")
+                room = self.maxsize - len(self._items) if self.maxsize else len(items)
+                if room <= 0:
+                    waited = time.monotonic()
+                    await self._changed.wait()
+                    self.put_blocked += time.monotonic() - waited
+                    continue
+                chunk, items = items[:room], items[room:]
+                self._items.extend(chunk)
+                self.items_in += len(chunk)
+                self.high_watermark = max(self.high_watermark, len(self._items))
+                self._changed.notify_all()
+    
+    async def get_batch(self, max_n=100, timeout=None, linger=0.0):
+        """Up to max_n items; [] after timeout or once closed and drained"""
+        loop = asyncio.get_running_loop()
+        waited = loop.time()
+        async with self._changed:
+            try:
+                await asyncio.wait_for(
+                    self._changed.wait_for(lambda: self._items or self._closed), timeout)
+                if linger > 0 and len(self._items) < max_n and not self._closed:
+                    await asyncio.wait_for(
+                        self._changed.wait_for(lambda: len(self._items) >= max_n or self._closed),
+                        linger)
+            except asyncio.TimeoutError:
+                pass
+            self.get_blocked += loop.time() - waited
+            count = min(max_n, len(self._items))
+            batch = [self._items.popleft() for _ in range(count)]
+            if batch:
+                self.batches_out += 1
+                self._changed.notify_all()
+            return batch
+    
+    async def close(self):
+        async with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+    
+    def metrics(self):
+        return {
+            "size": len(self._items),
+            "high_watermark": self.high_watermark,
+            "items": self.items_in,
+            "batches": self.batches_out,
+            "put_blocked": self.put_blocked,
+            "get_blocked": self.get_blocked,
+        }
+
+async def batch_queue_pattern():
+    n = 100_000
+    
+    queue = asyncio.Queue(maxsize=5_000)
+    
+    async def single_producer():
+        for i in range(n):
+            await queue.put(i)
+        await queue.put(None)
+    
+    async def single_consumer():
+        while await queue.get() is not None:
+            pass
+    
+    start = time.perf_counter()
+    await asyncio.gather(single_producer(), single_consumer())
+    single_time = time.perf_counter() - start
+    
+    batches = AsyncBatchQueue(maxsize=5_000)
+    received = []
+    
+    async def batch_producer():
+        for i in range(0, n, 500):
+            await batches.put_many(range(i, i + 500))
+        await batches.close()
+    
+    async def batch_consumer():
+        while batch := await batches.get_batch(max_n=500, linger=0.001):
+            received.extend(batch)
+    
+    start = time.perf_counter()
+    await asyncio.gather(batch_producer(), batch_consumer())
+    batch_time = time.perf_counter() - start
+    
+    metrics = batches.metrics()
+    print(f"asyncio.Queue: {n / single_time:,.0f} items/s; AsyncBatchQueue: "
+          f"{n / batch_time:,.0f} items/s ({single_time / batch_time:.0f}x), "
+          f"in order: {received == list(range(n))}")
+    print(f"AsyncBatchQueue: {metrics['batches']} batches, high watermark "
+          f"{metrics['high_watermark']}, producer blocked {metrics['put_blocked']:.3f}s")
+
+asyncio.run(batch_queue_pattern())
+
 # Pattern 2: Async Context Manager
 class AsyncContextManager:
     async def __aenter__(self):
@@ -378,6 +505,87 @@ asyncio.run(async_generator_example())
 print("\n=== Async Best Practices ===")
 
 # Best Practice 1: Use asyncio.gather() for concurrent operations
+async def _iterate(items):
+    """Async iterator over a sync or async iterable, pulled one item at a time"""
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+async def bounded_map(func, items, limit=10, *, ordered=False, task_timeout=None,
+                      timeout=None, retries=0, retry_delay=0.1, return_exceptions=False):
+    """Run func(item) for every item with at most `limit` tasks alive at once
+    
+    Unlike gather, items are pulled lazily and results are yielded as they
+    complete (or in input order with ordered=True), so memory stays
+    proportional to `limit` even for millions of items. task_timeout and
+    retries apply to each call (with exponential backoff between tries);
+    timeout is a deadline for the whole run and raises asyncio.TimeoutError.
+    Failures are raised, or yielded as exception objects with
+    return_exceptions=True, as in gather.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    
+    async def attempt(item):
+        for tries in range(retries + 1):
+            try:
+                if task_timeout is None:
+                    return await func(item)
+                return await asyncio.wait_for(func(item), task_timeout)
+            except Exception:
+                if tries == retries:
+                    raise
+                await asyncio.sleep(retry_delay * 2 ** tries)
+    
+    source = _iterate(items)
+    running = {}        # task -> input index
+    finished = {}       # index -> result, waiting for its turn (ordered only)
+    started = next_index = 0
+    exhausted = False
+    try:
+        while True:
+            # In ordered mode a slow head item also holds back new work, so
+            # the buffer of finished results can't grow past `limit` either
+            while (not exhausted and len(running) < limit
+                   and (not ordered or started < next_index + limit)):
+                try:
+                    item = await source.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                running[asyncio.create_task(attempt(item))] = started
+                started += 1
+            if not running:
+                return
+            remaining = None if deadline is None else deadline - loop.time()
+            done = ()
+            if remaining is None or remaining > 0:
+                done, _ = await asyncio.wait(running, timeout=remaining,
+                                             return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                raise asyncio.TimeoutError(f"{len(running)} tasks unfinished after {timeout}s")
+            for task in done:
+                index = running.pop(task)
+                error = task.exception()
+                if error is not None and not return_exceptions:
+                    raise error
+                result = task.result() if error is None else error
+                if ordered:
+                    finished[index] = result
+                else:
+                    yield result
+            while next_index in finished:
+                yield finished.pop(next_index)
+                next_index += 1
+    finally:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        await source.aclose()
+
 async def best_practice_gather():
     async def worker(name, delay):
         await asyncio.sleep(delay)
@@ -390,6 +598,30 @@ async def best_practice_gather():
         worker("C", 0.15)
     )
     print(f"Gather results: {results}")
+    
+    # Better for big or unbounded inputs: gather creates every task up
+    # front, bounded_map keeps only `limit` of them alive
+    active = peak = 0
+    
+    async def job(n):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.001)
+        active -= 1
+        return n
+    
+    start = time.monotonic()
+    total = 0
+    async for n in bounded_map(job, range(20000), limit=200):
+        total += n
+    print(f"bounded_map: 20,000 jobs in {time.monotonic() - start:.2f}s, "
+          f"at most {peak} running at once, sum {total}")
+    # C finishes first, but ordered=True still yields A, B, C
+    delays = {"A": 0.15, "B": 0.1, "C": 0.05}
+    ordered = [r async for r in bounded_map(lambda name: worker(name, delays[name]),
+                                            "ABC", limit=3, ordered=True)]
+    print(f"Ordered bounded_map results: {ordered}")
 
 asyncio.run(best_practice_gather())
 
@@ -459,23 +691,394 @@ print(f"Performance improvement: {sync_time/async_time:.2f}x")
 print("\n=== Real-world Async Examples ===")
 
 # Example 1: Async Web Server
+# A small HTTP/1.1 server on asyncio streams, no third-party packages needed
+import json
+import os
+from http import HTTPStatus
+
+class HTTPRequest:
+    def __init__(self, method, target, version, headers, body):
+        self.method = method
+        self.path, _, self.query = target.partition("?")
+        self.version = version
+        self.headers = headers      # lower-cased names
+        self.body = body
+    
+    @property
+    def keep_alive(self):
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+class HTTPResponse:
+    def __init__(self, body=b"", status=200, content_type="text/plain; charset=utf-8",
+                 headers=None, file_path=None):
+        self.body = body.encode() if isinstance(body, str) else body
+        self.status = status
+        self.headers = {"Content-Type": content_type, **(headers or {})}
+        self.file_path = file_path  # sent with sendfile instead of body
+    
+    @classmethod
+    def json(cls, data, status=200):
+        return cls(json.dumps(data), status, "application/json")
+
+class HTTPError(Exception):
+    def __init__(self, status, message=""):
+        super().__init__(message or HTTPStatus(status).phrase)
+        self.status = status
+
+class AsyncHTTPServer:
+    """HTTP/1.1 server with keep-alive, pipelining, a route table and static files
+    
+    Requests on one connection are read and answered in order, so pipelined
+    requests need no special handling: the StreamReader buffers them and
+    the loop picks up the next one as soon as the previous answer is
+    written. Connections beyond max_connections get a 503 and are closed.
+    """
+    
+    MAX_HEADER_BYTES = 16 * 1024
+    
+    def __init__(self, host="127.0.0.1", port=0, max_connections=1000,
+                 keep_alive_timeout=5.0, max_body_bytes=1024 * 1024):
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.keep_alive_timeout = keep_alive_timeout
+        self.max_body_bytes = max_body_bytes
+        self.routes = {}            # (method, path) -> async handler(request)
+        self.static_dirs = []       # (url prefix, directory)
+        self.connections = 0
+        self.requests_served = 0
+        self._server = None
+    
+    def route(self, path, method="GET"):
+        """Decorator registering an async handler(request) -> HTTPResponse"""
+        def register(handler):
+            self.routes[(method, path)] = handler
+            return handler
+        return register
+    
+    def static(self, prefix, directory):
+        self.static_dirs.append((prefix.rstrip("/") + "/", os.path.realpath(directory)))
+    
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port,
+                                                  limit=self.MAX_HEADER_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+    
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+    
+    async def __aenter__(self):
+        return await self.start()
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+        return False
+    
+    async def _read_request(self, reader):
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.keep_alive_timeout)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            return None         # client closed or idled out between requests
+        except asyncio.LimitOverrunError:
+            raise HTTPError(431)
+        lines = head[:-4].decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ")
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+        except ValueError:
+            raise HTTPError(400)
+        # int() would also take "-5", "+5" or "1_000"; only plain digits are valid
+        length = headers.get("content-length", "0")
+        if not (length.isascii() and length.isdigit()):
+            raise HTTPError(400, "invalid Content-Length")
+        length = int(length)
+        if "transfer-encoding" in headers:
+            raise HTTPError(501, "chunked request bodies are not supported")
+        if length > self.max_body_bytes:
+            raise HTTPError(413)
+        body = await reader.readexactly(length) if length else b""
+        return HTTPRequest(method, target, version, headers, body)
+    
+    async def _dispatch(self, request):
+        method = "GET" if request.method == "HEAD" else request.method
+        handler = self.routes.get((method, request.path))
+        if handler is not None:
+            return await handler(request)
+        if request.method in ("GET", "HEAD"):
+            for prefix, directory in self.static_dirs:
+                if request.path.startswith(prefix):
+                    path = os.path.realpath(os.path.join(directory, request.path[len(prefix):]))
+                    if path.startswith(directory + os.sep) and os.path.isfile(path):
+                        return HTTPResponse(file_path=path, content_type="application/octet-stream")
+        if any(path == request.path for _, path in self.routes):
+            raise HTTPError(405)
+        raise HTTPError(404)
+    
+    async def _send(self, writer, response, keep_alive, head_only=False):
+        length = os.path.getsize(response.file_path) if response.file_path else len(response.body)
+        status = HTTPStatus(response.status)
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}",
+                 f"Content-Length: {length}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        lines += [f"{name}: {value}" for name, value in response.headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if head_only:
+            pass
+        elif response.file_path:
+            await writer.drain()    # headers must go out before the file bytes
+            with open(response.file_path, "rb") as f:
+                # Zero-copy where the OS supports it, read/send otherwise
+                await asyncio.get_running_loop().sendfile(writer.transport, f)
+        else:
+            writer.write(response.body)
+        await writer.drain()
+    
+    async def _handle_connection(self, reader, writer):
+        if self.connections >= self.max_connections:
+            await self._send(writer, HTTPResponse("server busy", 503), keep_alive=False)
+            writer.close()
+            return
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    # Can't trust where the next request starts, so hang up
+                    await self._send(writer, HTTPResponse(str(e), e.status), keep_alive=False)
+                    break
+                if request is None:
+                    break
+                try:
+                    response = await self._dispatch(request)
+                except HTTPError as e:
+                    response = HTTPResponse(str(e), e.status)
+                except Exception as e:
+                    response = HTTPResponse(f"internal error: {e}", 500)
+                await self._send(writer, response, request.keep_alive,
+                                 head_only=request.method == "HEAD")
+                self.requests_served += 1
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass    # client went away mid-request
+        finally:
+            self.connections -= 1
+            writer.close()
+
+async def read_http_response(reader):
+    """Read one Content-Length framed response; returns (status, body)"""
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":")[1])
+    return status, await reader.readexactly(length)
+
+async def http_load_test(host, port, path="/", connections=20, requests_per_connection=250,
+                         pipeline_depth=1):
+    """Hammer a server with keep-alive connections; returns requests/s and latency percentiles
+    
+    pipeline_depth > 1 sends that many requests before reading the answers.
+    """
+    latencies = []
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode()
+    
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            remaining = requests_per_connection
+            while remaining:
+                batch = min(pipeline_depth, remaining)
+                sent = time.perf_counter()
+                writer.write(request * batch)
+                for _ in range(batch):
+                    status, _ = await read_http_response(reader)
+                    if status != 200:
+                        raise RuntimeError("unexpected status")
+                    latencies.append(time.perf_counter() - sent)
+                remaining -= batch
+        finally:
+            writer.close()
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    
+    return {
+        "requests": len(latencies),
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": percentile(0.50),
+        "p99_ms": percentile(0.99),
+    }
+
 async def async_web_server():
-    from aiohttp import web
+    server = AsyncHTTPServer(max_connections=100)
     
+    @server.route("/")
     async def handle_request(request):
-        await asyncio.sleep(0.1)  # Simulate processing
-        return web.Response(text="Hello, Async World!")
+        return HTTPResponse("Hello, Async World!")
+    
+    @server.route("/echo", method="POST")
+    async def echo(request):
+        return HTTPResponse.json({"received": request.body.decode()})
     
-    app = web.Application()
-    app.router.add_get('/', handle_request)
+    with open("static_test.txt", "w") as f:
+        f.write("static file contents\n" * 100)
+    server.static("/static", ".")
     
-    # This would start the server
-    # web.run_app(app, host='localhost', port=8080)
-    print("Async web server example (aiohttp not installed)")
+    async with server:
+        print(f"Async web server listening on http://{server.host}:{server.port}")
+        
+        # Three pipelined requests on one connection, answered in order
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        writer.write(b"GET / HTTP/1.1\r\nHost: x\r\n\r\n"
+                     b"POST /echo HTTP/1.1\r\nHost: x\r\nContent-Length: 5\r\n\r\nhello"
+                     b"GET /static/static_test.txt HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n")
+        for _ in range(3):
+            status, body = await read_http_response(reader)
+            print(f"  {status}: {body[:40]!r}")
+        writer.close()
+        
+        for depth in (1, 8):
+            stats = await http_load_test(server.host, server.port, pipeline_depth=depth)
+            print(f"  load test (pipeline depth {depth}): {stats['requests']} requests, "
+                  f"{stats['requests_per_second']:.0f} req/s, p50 {stats['p50_ms']:.2f}ms, "
+                  f"p99 {stats['p99_ms']:.2f}ms")
+    print(f"Server stopped after {server.requests_served} requests")
+    os.remove("static_test.txt")
 
 asyncio.run(async_web_server())
 
 # Example 2: Async Data Processing Pipeline
+class StageMetrics:
+    """Per-stage counters for AsyncPipeline"""
+    
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.processed = 0
+        self.busy_seconds = 0.0
+        self.max_latency = 0.0
+        self.started = None
+        self.finished = None
+    
+    def __repr__(self):
+        elapsed = (self.finished or time.monotonic()) - (self.started or time.monotonic())
+        average = self.busy_seconds / self.processed if self.processed else 0.0
+        throughput = self.processed / elapsed if elapsed > 0 else 0.0
+        return (f"{self.name}: {self.processed} items, avg {average * 1000:.0f}ms, "
+                f"max {self.max_latency * 1000:.0f}ms, {throughput:.1f} items/s")
+
+_STOP = object()
+
+class AsyncPipeline:
+    """Stages connected by bounded asyncio.Queues, each with its own workers
+    
+    Items flow through as soon as a stage finishes them, so the first
+    result is ready after one item's path instead of after every item has
+    passed every stage. Full queues make fast stages wait for slow ones
+    (backpressure). Results may come out in a different order than the
+    input when a stage has more than one worker.
+    """
+    
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self.stages = []            # (name, coroutine function, workers)
+        self.metrics = []
+        self._draining = False
+    
+    def add_stage(self, name, func, workers=1):
+        self.stages.append((name, func, workers))
+        return self
+    
+    def drain(self):
+        """Stop taking new source items; items already inside still finish"""
+        self._draining = True
+    
+    async def _feed(self, source, queue):
+        if hasattr(source, "__aiter__"):
+            async for item in source:
+                if self._draining:
+                    break
+                await queue.put(item)
+        else:
+            for item in source:
+                if self._draining:
+                    break
+                await queue.put(item)
+        await queue.put(_STOP)
+    
+    async def _worker(self, func, metrics, inbox, outbox, alive):
+        while True:
+            item = await inbox.get()
+            if item is _STOP:
+                await inbox.put(_STOP)      # let sibling workers see it too
+                alive[0] -= 1
+                if alive[0] == 0:
+                    metrics.finished = time.monotonic()
+                    await outbox.put(_STOP)
+                return
+            started = time.monotonic()
+            result = await func(item)
+            latency = time.monotonic() - started
+            metrics.processed += 1
+            metrics.busy_seconds += latency
+            metrics.max_latency = max(metrics.max_latency, latency)
+            await outbox.put(result)
+    
+    async def stream(self, source):
+        """Async generator of final results, yielded as they come out"""
+        self._draining = False
+        queues = [asyncio.Queue(self.queue_size) for _ in range(len(self.stages) + 1)]
+        self.metrics = []
+        tasks = [asyncio.create_task(self._feed(source, queues[0]))]
+        for i, (name, func, workers) in enumerate(self.stages):
+            metrics = StageMetrics(name, workers)
+            metrics.started = time.monotonic()
+            self.metrics.append(metrics)
+            alive = [workers]
+            tasks += [asyncio.create_task(self._worker(func, metrics, queues[i], queues[i + 1], alive))
+                      for _ in range(workers)]
+        output = queues[-1]
+        try:
+            while True:
+                getter = asyncio.ensure_future(output.get())
+                done, _ = await asyncio.wait([getter, *tasks], return_when=asyncio.FIRST_COMPLETED)
+                if getter not in done:
+                    getter.cancel()
+                    for task in done:
+                        if task.exception() is not None:
+                            raise task.exception()   # a stage failed
+                    tasks = [task for task in tasks if not task.done()]
+                    continue
+                item = getter.result()
+                if item is _STOP:
+                    return
+                yield item
+        finally:
+            # Normal end, error, or the consumer stopped early: cancel everything
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def run(self, source):
+        """Run the pipeline to completion and return all results"""
+        return [item async for item in self.stream(source)]
+
 async def async_data_pipeline():
     async def fetch_data(source):
         await asyncio.sleep(0.1)
@@ -492,47 +1095,484 @@ async def async_data_pipeline():
     # Process data pipeline
     sources = ["API", "Database", "File"]
     
-    # Fetch data concurrently
-    raw_data = await asyncio.gather(*[fetch_data(source) for source in sources])
-    
-    # Process data concurrently
-    processed_data = await asyncio.gather(*[process_data(data) for data in raw_data])
-    
-    # Save data concurrently
-    saved_data = await asyncio.gather(*[save_data(data) for data in processed_data])
+    pipeline = (AsyncPipeline(queue_size=10)
+                .add_stage("fetch", fetch_data, workers=3)
+                .add_stage("process", process_data, workers=3)
+                .add_stage("save", save_data, workers=3))
+    saved_data = await pipeline.run(sources)
     
     print("Data pipeline results:")
     for result in saved_data:
         print(f"  {result}")
+    
+    # With uneven latencies, gather barriers wait for the slowest item at
+    # every stage; the streaming pipeline saves each item as soon as it's done
+    async def variable_fetch(n):
+        await asyncio.sleep(0.02 * (n % 10))
+        return n
+    
+    async def variable_process(n):
+        await asyncio.sleep(0.02 * ((n * 7) % 10))
+        return n
+    
+    start = time.monotonic()
+    raw = await asyncio.gather(*[variable_fetch(n) for n in range(30)])
+    processed = await asyncio.gather(*[variable_process(n) for n in raw])
+    await asyncio.gather(*[save_data(n) for n in processed])
+    barrier_time = time.monotonic() - start
+    
+    streaming = (AsyncPipeline(queue_size=5)
+                 .add_stage("fetch", variable_fetch, workers=30)
+                 .add_stage("process", variable_process, workers=30)
+                 .add_stage("save", save_data, workers=30))
+    start = time.monotonic()
+    first_result = None
+    async for _ in streaming.stream(range(30)):
+        if first_result is None:
+            first_result = time.monotonic() - start
+    streaming_time = time.monotonic() - start
+    print(f"gather barriers: {barrier_time:.2f}s, streaming: first result after "
+          f"{first_result:.2f}s, all done in {streaming_time:.2f}s")
+    for metrics in streaming.metrics:
+        print(f"  {metrics}")
 
 asyncio.run(async_data_pipeline())
 
 # Example 3: Async Monitoring System
+import heapq
+import random
+
+class CheckState:
+    """One registered check plus its running statistics"""
+    
+    def __init__(self, name, check, interval, generation):
+        self.name = name
+        self.check = check          # async callable, raises on failure
+        self.interval = interval
+        self.generation = generation  # heap entries with another value are stale
+        self.task = None
+        self.runs = 0
+        self.failures = 0
+        self.overruns = 0           # due again while the last run was still going
+        self.last_error = None
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.max_lag = 0.0          # how late a run started versus its slot
+        self.recent = deque(maxlen=100)
+    
+    def stats(self):
+        recent = sorted(self.recent)
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "overruns": self.overruns,
+            "avg_latency": self.total_latency / self.runs if self.runs else 0.0,
+            "p95_latency": recent[int(len(recent) * 0.95)] if recent else 0.0,
+            "max_latency": self.max_latency,
+            "max_lag": self.max_lag,
+            "last_error": self.last_error,
+        }
+
+class MonitoringScheduler:
+    """Runs thousands of periodic checks from one task and a heap of due times
+    
+    Each check's slots are computed from its first slot plus whole
+    intervals, so they don't drift however long the checks take; jitter
+    only delays a slot by up to jitter * interval, which spreads out
+    checks that share an interval. At most max_concurrent checks run at
+    once. A check that is still running when it comes due again is
+    counted as an overrun and skipped rather than stacked.
+    """
+    
+    def __init__(self, max_concurrent=100, jitter=0.1):
+        self.max_concurrent = max_concurrent
+        self.jitter = jitter
+        self.checks = {}
+        self._heap = []             # (due time, generation, name)
+        self._generation = 0
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._wakeup = asyncio.Event()
+        self._running = set()
+        self._stopping = False
+    
+    def _push(self, state, base):
+        state.base = base
+        due = base + random.uniform(0, self.jitter * state.interval)
+        heapq.heappush(self._heap, (due, state.generation, state.name))
+        self._wakeup.set()
+    
+    def add_check(self, name, check, interval, first_run=None):
+        """Register (or replace) a check; the first run defaults to a random point in one interval"""
+        self._generation += 1
+        previous = self.checks.get(name)
+        state = self.checks[name] = CheckState(name, check, interval, self._generation)
+        if previous is not None:
+            state.task = previous.task
+        loop = asyncio.get_running_loop()
+        self._push(state, loop.time() + (random.uniform(0, interval) if first_run is None else first_run))
+        return state
+    
+    def remove_check(self, name):
+        # The heap entry stays behind and is dropped when it surfaces
+        return self.checks.pop(name, None)
+    
+    def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+    
+    async def _execute(self, state, due):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        state.max_lag = max(state.max_lag, started - due)
+        try:
+            await state.check()
+        except asyncio.CancelledError:
+            self._slots.release()
+            raise
+        except Exception as e:
+            state.failures += 1
+            state.last_error = repr(e)
+        latency = loop.time() - started
+        state.runs += 1
+        state.total_latency += latency
+        state.max_latency = max(state.max_latency, latency)
+        state.recent.append(latency)
+        self._slots.release()
+    
+    async def run(self, duration=None):
+        loop = asyncio.get_running_loop()
+        deadline = None if duration is None else loop.time() + duration
+        self._stopping = False
+        try:
+            while not self._stopping:
+                now = loop.time()
+                if deadline is not None and now >= deadline:
+                    break
+                if self._heap:
+                    due, generation, name = self._heap[0]
+                    state = self.checks.get(name)
+                    if state is None or state.generation != generation:
+                        heapq.heappop(self._heap)   # removed or replaced check
+                        continue
+                    if due <= now:
+                        heapq.heappop(self._heap)
+                        # Next slot on the original grid, skipping any we missed
+                        missed = int((now - state.base) // state.interval)
+                        self._push(state, state.base + (missed + 1) * state.interval)
+                        if state.task is not None and not state.task.done():
+                            state.overruns += 1
+                            continue
+                        await self._slots.acquire()
+                        state.task = asyncio.create_task(self._execute(state, due))
+                        self._running.add(state.task)
+                        state.task.add_done_callback(self._running.discard)
+                        continue
+                    timeout = due - now
+                else:
+                    timeout = None
+                if deadline is not None:
+                    timeout = min(timeout or deadline - now, deadline - now)
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            running = list(self._running)
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+
 async def async_monitoring_system():
-    async def monitor_service(service_name):
-        while True:
-            await asyncio.sleep(0.1)
-            print(f"Monitoring {service_name}")
-            # Simulate monitoring logic
-            await asyncio.sleep(0.1)
+    scheduler = MonitoringScheduler(max_concurrent=10, jitter=0.1)
+    
+    def monitor_service(service_name, work=0.02, fail=False):
+        async def check():
+            await asyncio.sleep(work)   # Simulate monitoring logic
+            if fail:
+                raise ConnectionError(f"{service_name} unreachable")
+        return check
     
-    # Start monitoring tasks
     services = ["Web Server", "Database", "Cache", "Queue"]
-    tasks = [asyncio.create_task(monitor_service(service)) for service in services]
+    for service in services:
+        scheduler.add_check(service, monitor_service(service), interval=0.1)
+    scheduler.add_check("Mail", monitor_service("Mail", fail=True), interval=0.1)
+    scheduler.add_check("Batch Job", monitor_service("Batch Job", work=0.25), interval=0.1)
+    
+    async def reconfigure():
+        await asyncio.sleep(0.25)
+        scheduler.remove_check("Queue")                 # dynamic removal
+        scheduler.add_check("Search", monitor_service("Search"), interval=0.05, first_run=0)
+    
+    asyncio.create_task(reconfigure())
+    await scheduler.run(duration=0.5)
     
-    # Run for a short time
-    await asyncio.sleep(0.5)
+    for name, state in scheduler.checks.items():
+        stats = state.stats()
+        print(f"Monitoring {name}: {stats['runs']} runs, {stats['failures']} failures, "
+              f"{stats['overruns']} overruns, avg {stats['avg_latency'] * 1000:.0f}ms")
     
-    # Cancel all tasks
-    for task in tasks:
-        task.cancel()
+    # One scheduler task handles thousands of checks
+    scheduler = MonitoringScheduler(max_concurrent=500, jitter=0.2)
+    for i in range(10000):
+        scheduler.add_check(f"check-{i}", monitor_service(i, work=0.001), interval=1.0)
+    await scheduler.run(duration=2.0)
+    states = scheduler.checks.values()
+    total_runs = sum(state.runs for state in states)
+    worst_lag = max(state.max_lag for state in states)
+    print(f"10,000 checks: {total_runs} runs in 2s, worst start lag {worst_lag * 1000:.0f}ms")
     
     print("Monitoring system stopped")
 
 asyncio.run(async_monitoring_system())
 
+# 13. Event Loop Instrumentation
+print("\n=== Event Loop Instrumentation ===")
+
+import functools
+import sys
+import threading
+import traceback
+
+class LatencyHistogram:
+    """HDR-style histogram: log-scaled buckets with SUB_BITS bits of precision
+    
+    Values are recorded in microseconds. Each power of two is split into
+    2**(SUB_BITS - 1) linear buckets, so any reported value is within about
+    3% of the real one while memory stays a few hundred counters at most.
+    """
+    
+    SUB_BITS = 5
+    
+    def __init__(self):
+        self.counts = {}            # bucket index -> count
+        self.count = 0
+        self.max = 0
+    
+    def record(self, seconds):
+        value = max(0, int(seconds * 1_000_000))
+        shift = max(0, value.bit_length() - self.SUB_BITS)
+        index = (shift << (self.SUB_BITS - 1)) + (value >> shift)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.max = max(self.max, value)
+    
+    def _bucket_value(self, index):
+        half = 1 << (self.SUB_BITS - 1)
+        shift = max(0, index // half - 1)
+        low = (index - (shift << (self.SUB_BITS - 1))) << shift
+        return low + ((1 << shift) - 1) / 2     # middle of the bucket
+    
+    def percentile(self, p):
+        """Value in seconds below which p percent of recordings fall"""
+        if not self.count:
+            return 0.0
+        rank = max(1, round(self.count * p / 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._bucket_value(index), self.max) / 1_000_000
+        return self.max / 1_000_000
+    
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "p50_ms": self.percentile(50) * 1000,
+            "p90_ms": self.percentile(90) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max / 1000,
+        }
+
+class LoopMonitor:
+    """Everything measured on one instrumented loop
+    
+    A watchdog thread looks at the callback in progress every half
+    threshold; if it has been running longer than the threshold it grabs
+    the loop thread's stack, which shows where the loop is stuck rather
+    than where the task happens to resume later.
+    """
+    
+    def __init__(self, slow_callback=0.05, heartbeat_interval=0.05, keep_slow=50):
+        self.slow_callback = slow_callback
+        self.heartbeat_interval = heartbeat_interval
+        self.callbacks = LatencyHistogram()
+        self.heartbeat_lag = LatencyHistogram()
+        self.slow_callbacks = deque(maxlen=keep_slow)
+        self.task_lifetimes = {}    # task name -> LatencyHistogram
+        self.task_run_times = {}
+        self._run_times = {}        # task -> seconds spent in its steps so far
+        self._current = None        # (start time, callback) while one runs
+        self._captured = None       # (start time, stack) grabbed by the watchdog
+        self.loop_thread = None
+        self._stop = threading.Event()
+        self._watchdog = None
+    
+    def start_watchdog(self):
+        if self._watchdog is None:
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+    
+    def stop(self):
+        self._stop.set()
+    
+    def _watch(self):
+        while not self._stop.wait(self.slow_callback / 2):
+            current = self._current
+            if current is None or time.perf_counter() - current[0] < self.slow_callback:
+                continue
+            if self._captured is not None and self._captured[0] == current[0]:
+                continue            # already have this one
+            frame = sys._current_frames().get(self.loop_thread)
+            if frame is not None:
+                self._captured = (current[0], traceback.format_stack(frame))
+    
+    def record_callback(self, callback, started, duration):
+        self.callbacks.record(duration)
+        task = getattr(callback, "__self__", None)
+        if isinstance(task, asyncio.Task):
+            self._run_times[task] = self._run_times.get(task, 0.0) + duration
+        if duration >= self.slow_callback:
+            captured = self._captured
+            self.slow_callbacks.append({
+                "callback": task.get_name() if isinstance(task, asyncio.Task) else repr(callback),
+                "duration_ms": duration * 1000,
+                "stack": captured[1] if captured and captured[0] == started else None,
+            })
+    
+    def task_done(self, created, task):
+        name = task.get_name()
+        if name.startswith("Task-"):
+            name = "Task-*"         # unnamed tasks are grouped together
+        lifetime = self.task_lifetimes.setdefault(name, LatencyHistogram())
+        lifetime.record(time.perf_counter() - created)
+        run_time = self.task_run_times.setdefault(name, LatencyHistogram())
+        run_time.record(self._run_times.pop(task, 0.0))
+    
+    async def heartbeat(self):
+        """Sleep interval after interval; oversleeping is time the loop was busy"""
+        while True:
+            expected = time.perf_counter() + self.heartbeat_interval
+            await asyncio.sleep(self.heartbeat_interval)
+            self.heartbeat_lag.record(max(0.0, time.perf_counter() - expected))
+    
+    def snapshot(self):
+        return {
+            "callbacks": self.callbacks.to_dict(),
+            "heartbeat_lag": self.heartbeat_lag.to_dict(),
+            "slow_callbacks": list(self.slow_callbacks),
+            "tasks": {name: {"lifetime": self.task_lifetimes[name].to_dict(),
+                             "run_time": self.task_run_times[name].to_dict()}
+                      for name in self.task_lifetimes},
+        }
+    
+    def to_json(self, path=None):
+        data = json.dumps(self.snapshot(), indent=2)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(data)
+        return data
+
+class InstrumentedEventLoop(asyncio.SelectorEventLoop):
+    """Selector loop that times every scheduled callback and task step
+    
+    call_soon and call_at cover task steps, wake-ups, timers and future
+    callbacks; the transports' own socket reads are not timed, but the
+    work they wake up is.
+    """
+    
+    def __init__(self, monitor):
+        super().__init__()
+        self.monitor = monitor
+        self.set_task_factory(self._create_task)
+        self._heartbeat = None
+    
+    def _timed(self, callback, *args):
+        monitor = self.monitor
+        started = time.perf_counter()
+        monitor._current = (started, callback)
+        try:
+            callback(*args)
+        finally:
+            monitor._current = None
+            monitor.record_callback(callback, started, time.perf_counter() - started)
+    
+    def call_soon(self, callback, *args, context=None):
+        return super().call_soon(self._timed, callback, *args, context=context)
+    
+    def call_at(self, when, callback, *args, context=None):
+        return super().call_at(when, self._timed, callback, *args, context=context)
+    
+    def call_soon_threadsafe(self, callback, *args, context=None):
+        return super().call_soon_threadsafe(self._timed, callback, *args, context=context)
+    
+    @staticmethod
+    def _create_task(loop, coro, **kwargs):
+        task = asyncio.Task(coro, loop=loop, **kwargs)
+        task.add_done_callback(functools.partial(loop.monitor.task_done, time.perf_counter()))
+        return task
+    
+    def run_forever(self):
+        self.monitor.loop_thread = threading.get_ident()
+        self.monitor.start_watchdog()
+        if self._heartbeat is None:
+            self._heartbeat = self.create_task(self.monitor.heartbeat(), name="loop-heartbeat")
+        super().run_forever()
+    
+    def close(self):
+        self.monitor.stop()
+        super().close()
+
+class InstrumentedEventLoopPolicy(asyncio.DefaultEventLoopPolicy):
+    """Opt in with asyncio.set_event_loop_policy(InstrumentedEventLoopPolicy())"""
+    
+    def __init__(self, slow_callback=0.05, heartbeat_interval=0.05):
+        super().__init__()
+        self.slow_callback = slow_callback
+        self.heartbeat_interval = heartbeat_interval
+        self.monitors = []
+    
+    def new_event_loop(self):
+        monitor = LoopMonitor(self.slow_callback, self.heartbeat_interval)
+        self.monitors.append(monitor)
+        return InstrumentedEventLoop(monitor)
+
+async def instrumented_workload():
+    async def fetch(i):
+        await asyncio.sleep(0.01 * (i % 5))
+    
+    def build_report():
+        time.sleep(0.2)     # blocking call stalls the whole loop
+    
+    async def report_builder():
+        await asyncio.sleep(0.05)
+        build_report()
+    
+    await asyncio.gather(*(asyncio.create_task(fetch(i), name="fetch") for i in range(200)),
+                         asyncio.create_task(report_builder(), name="report-builder"))
+    await asyncio.sleep(0.1)
+
+policy = InstrumentedEventLoopPolicy(slow_callback=0.05)
+asyncio.set_event_loop_policy(policy)
+try:
+    asyncio.run(instrumented_workload())
+finally:
+    asyncio.set_event_loop_policy(None)
+
+snapshot = policy.monitors[-1].snapshot()
+print(f"Callbacks timed: {snapshot['callbacks']['count']}, "
+      f"p99 {snapshot['callbacks']['p99_ms']:.2f}ms")
+print(f"Heartbeat lag: p50 {snapshot['heartbeat_lag']['p50_ms']:.1f}ms, "
+      f"max {snapshot['heartbeat_lag']['max_ms']:.1f}ms")
+for slow in snapshot["slow_callbacks"]:
+    where = slow["stack"][-1].strip().splitlines()[0] if slow["stack"] else "stack not captured"
+    print(f"Slow callback {slow['callback']}: {slow['duration_ms']:.0f}ms at {where}")
+for name, stats in snapshot["tasks"].items():
+    print(f"Task {name}: {stats['lifetime']['count']} done, lifetime p99 "
+          f"{stats['lifetime']['p99_ms']:.1f}ms, run time max {stats['run_time']['max_ms']:.1f}ms")
+print(f"JSON snapshot: {len(policy.monitors[-1].to_json())} bytes")
+
 # Cleanup
-import os
 if os.path.exists("async_test.txt"):
     os.remove("async_test.txt")
 
@@ -562,11 +1602,11 @@ async def async_file_downloader():
         ("file4.txt", 8)
     ]
     
-    tasks = [download_file(filename, size) for filename, size in files]
-    results = await asyncio.gather(*tasks)
+    # At most two downloads at a time, results kept in the order of `files`
+    results = bounded_map(lambda file: download_file(*file), files, limit=2, ordered=True)
     
     print("Download results:")
-    for result in results:
+    async for result in results:
         print(f"  {result}")
 
 asyncio.run(async_file_downloader())
@@ -574,46 +1614,218 @@ asyncio.run(async_file_downloader())
 # 2. Async URL processor
 print("\nExercise 2: Async URL Processor")
 async def async_url_processor():
+    attempts = {}
+    
     async def process_url(url):
+        attempts[url] = attempts.get(url, 0) + 1
+        if "slow" in url and attempts[url] == 1:
+            await asyncio.sleep(1)  # first try hangs, the retry succeeds
         await asyncio.sleep(0.1)
-        return f"Processed {url}"
+        return f"Processed {url} (attempt {attempts[url]})"
     
     urls = [
         "http://example.com",
         "http://google.com",
+        "http://slow.example.org",
         "http://github.com"
     ]
     
-    tasks = [process_url(url) for url in urls]
-    results = await asyncio.gather(*tasks)
-    
+    # Results arrive as they complete; a hung request is cut off after
+    # 0.5s and retried once, and the whole batch must finish within 5s
     print("URL processing results:")
-    for result in results:
+    async for result in bounded_map(process_url, urls, limit=3, task_timeout=0.5,
+                                    retries=1, retry_delay=0, timeout=5):
         print(f"  {result}")
 
 asyncio.run(async_url_processor())
 
 # 3. Async database context manager
 print("\nExercise 3: Async Database Context Manager")
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
 class AsyncDatabaseConnection:
+    """sqlite3 behind asyncio: reader threads in WAL mode plus one writer thread
+    
+    Every connection lives on its own single-thread executor, so it is only
+    ever used from the thread that opened it and queries never block the
+    event loop. WAL lets readers run while the writer commits. Writes are
+    queued and group-committed: everything that arrives within
+    commit_delay (or up to max_batch statements) shares one transaction and
+    one fsync, each statement in its own savepoint so a failing one
+    doesn't undo the others.
+    """
+    
+    def __init__(self, path="async_test.db", readers=2, batch_size=500,
+                 commit_delay=0.002, max_batch=1000):
+        self.path = path
+        self.batch_size = batch_size
+        self.commit_delay = commit_delay
+        self.max_batch = max_batch
+        self._reader_count = readers
+        self._readers = []          # [executor, connection, jobs in flight]
+        self._writer = None
+        self._write_conn = None
+        self._pending = []          # (sql, params, many, future)
+        self._flush_task = None
+        self.reads = 0
+        self.writes = 0
+        self.commits = 0
+    
+    async def _open(self, executor):
+        loop = asyncio.get_running_loop()
+        conn = await loop.run_in_executor(
+            executor, lambda: sqlite3.connect(self.path, isolation_level=None))
+        return conn
+    
     async def __aenter__(self):
         print("Connecting to database")
-        await asyncio.sleep(0.1)
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix="db-writer")
+        self._write_conn = await self._open(self._writer)
+        await self._run_write(lambda: self._write_conn.execute("PRAGMA journal_mode=WAL"))
+        await self._run_write(lambda: self._write_conn.execute("PRAGMA synchronous=NORMAL"))
+        for i in range(self._reader_count):
+            executor = ThreadPoolExecutor(1, thread_name_prefix=f"db-reader-{i}")
+            self._readers.append([executor, await self._open(executor), 0])
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         print("Closing database connection")
-        await asyncio.sleep(0.1)
+        if self._flush_task is not None:
+            await self._flush_task
+        loop = asyncio.get_running_loop()
+        for executor, conn, _ in self._readers + [[self._writer, self._write_conn, 0]]:
+            await loop.run_in_executor(executor, conn.close)
+            executor.shutdown()
+        self._readers = []
         return False
     
-    async def query(self, sql):
-        await asyncio.sleep(0.1)
-        return f"Result for: {sql}"
+    def _run_write(self, func):
+        return asyncio.get_running_loop().run_in_executor(self._writer, func)
+    
+    async def _run_read(self, func, reader=None):
+        # Least busy reader, unless the caller is pinned to one (open cursor)
+        reader = reader or min(self._readers, key=lambda r: r[2])
+        reader[2] += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(reader[0], func, reader[1])
+        finally:
+            reader[2] -= 1
+    
+    async def query(self, sql, params=()):
+        """Run a read-only statement on a reader thread; returns all rows"""
+        self.reads += 1
+        return await self._run_read(lambda conn: conn.execute(sql, params).fetchall())
+    
+    async def iterate(self, sql, params=(), batch_size=None):
+        """Async iterator over rows, fetched batch_size at a time on one reader"""
+        batch_size = batch_size or self.batch_size
+        reader = min(self._readers, key=lambda r: r[2])
+        self.reads += 1
+        cursor = await self._run_read(lambda conn: conn.execute(sql, params), reader)
+        try:
+            while True:
+                rows = await self._run_read(lambda conn: cursor.fetchmany(batch_size), reader)
+                for row in rows:
+                    yield row
+                if len(rows) < batch_size:
+                    break
+        finally:
+            await self._run_read(lambda conn: cursor.close(), reader)
+    
+    def execute(self, sql, params=()):
+        """Queue a write; resolves to (lastrowid, rowcount) once it is committed"""
+        return self._queue(sql, params, False)
+    
+    def executemany(self, sql, seq_of_params):
+        return self._queue(sql, list(seq_of_params), True)
+    
+    def _queue(self, sql, params, many):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((sql, params, many, future))
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush())
+        return future
+    
+    async def _flush(self):
+        while self._pending:
+            if len(self._pending) < self.max_batch:
+                await asyncio.sleep(self.commit_delay)   # let more writes join this commit
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            try:
+                results = await self._run_write(lambda: self._commit_batch(batch))
+            except Exception as e:      # the commit itself failed, so every write did
+                results = [e] * len(batch)
+            self.commits += 1
+            self.writes += len(batch)
+            for (_, _, _, future), result in zip(batch, results):
+                if future.done():
+                    continue            # caller gave up waiting
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        self._flush_task = None
+    
+    def _commit_batch(self, batch):
+        # Runs on the writer thread
+        conn = self._write_conn
+        results = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for sql, params, many, _ in batch:
+                conn.execute("SAVEPOINT write")
+                try:
+                    cursor = conn.executemany(sql, params) if many else conn.execute(sql, params)
+                    results.append((cursor.lastrowid, cursor.rowcount))
+                    conn.execute("RELEASE write")
+                except sqlite3.Error as e:
+                    conn.execute("ROLLBACK TO write")
+                    conn.execute("RELEASE write")
+                    results.append(e)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return results
 
 async def async_database_example():
     async with AsyncDatabaseConnection() as db:
-        result = await db.query("SELECT * FROM users")
+        await db.execute("CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, name TEXT UNIQUE)")
+        
+        # 2,000 concurrent single-row inserts end up in a handful of commits
+        start = time.monotonic()
+        await asyncio.gather(*(db.execute("INSERT INTO users (name) VALUES (?)", (f"user{i}",))
+                               for i in range(2000)))
+        print(f"2000 inserts in {time.monotonic() - start:.2f}s using {db.commits - 1} commits")
+        
+        try:
+            await db.execute("INSERT INTO users (name) VALUES (?)", ("user1",))
+        except sqlite3.IntegrityError as e:
+            print(f"Duplicate rejected on its own: {e}")
+        
+        result = await db.query("SELECT COUNT(*) FROM users")
         print(f"Database result: {result}")
+        
+        # Stream a large result without loading it all; the loop stays free meanwhile
+        ticks = 0
+        
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0)
+                ticks += 1
+        
+        ticking = asyncio.create_task(ticker())
+        rows = 0
+        async for row in db.iterate("SELECT id, name FROM users ORDER BY id", batch_size=250):
+            rows += 1
+        ticking.cancel()
+        print(f"Streamed {rows} rows while the event loop ran {ticks} other steps")
+    
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists("async_test.db" + suffix):
+            os.remove("async_test.db" + suffix)
 
 asyncio.run(async_database_example())
 
@@ -632,24 +1844,130 @@ asyncio.run(async_generator_example())
 
 # 5. Async rate limiter
 print("\nExercise 5: Async Rate Limiter")
+from collections import OrderedDict
+
+class RateLimitExceeded(Exception):
+    """Raised when an acquire would have to wait longer than its timeout"""
+
 class AsyncRateLimiter:
-    def __init__(self, max_requests=5, time_window=1):
+    """Token-bucket limiter using GCRA (Generic Cell Rate Algorithm)
+    
+    Instead of a list of timestamps we keep one number: the theoretical
+    arrival time (TAT) of the next request. Each acquire reserves its slot
+    by pushing TAT forward, so acquire is O(1) and nobody retries. Waiters
+    form a chain (each one waits for the previous one to go first), which
+    keeps them strictly first-come first-served.
+    """
+    
+    def __init__(self, max_requests=5, time_window=1, burst=None):
         self.max_requests = max_requests
         self.time_window = time_window
-        self.requests = []
+        self.interval = time_window / max_requests   # seconds per token
+        self.burst = burst or max_requests           # tokens available at once
+        self.tat = 0.0
+        self._last_waiter = None    # future completed when the latest waiter proceeds
+        self.acquired = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
     
-    async def acquire(self):
-        now = time.time()
-        
-        # Remove old requests
-        self.requests = [req_time for req_time in self.requests 
-                        if now - req_time < self.time_window]
-        
-        if len(self.requests) >= self.max_requests:
-            await asyncio.sleep(self.time_window - (now - self.requests[0]))
-            return await self.acquire()
-        
-        self.requests.append(now)
+    def _reserve(self, weight, now):
+        """Seconds to wait before a request of this weight may proceed"""
+        if weight > self.burst:
+            raise ValueError(f"weight {weight} exceeds burst capacity {self.burst}")
+        start = max(self.tat, now)
+        return start + weight * self.interval - self.burst * self.interval - now, start
+    
+    def try_acquire(self, weight=1):
+        """Take tokens without waiting; returns False if none are available"""
+        now = time.monotonic()
+        wait, start = self._reserve(weight, now)
+        queued = self._last_waiter is not None and not self._last_waiter.done()
+        if wait > 0 or queued:
+            self.rejected += 1
+            return False
+        self.tat = start + weight * self.interval
+        self.acquired += 1
+        return True
+    
+    async def acquire(self, weight=1, timeout=None):
+        """Wait for tokens; raises RateLimitExceeded if it would take over timeout"""
+        now = time.monotonic()
+        wait, start = self._reserve(weight, now)
+        if timeout is not None and wait > timeout:
+            self.rejected += 1
+            raise RateLimitExceeded(f"would wait {wait:.3f}s (timeout {timeout}s)")
+        reserved_tat = start + weight * self.interval
+        self.tat = reserved_tat
+        ready_at = now + wait
+        previous = self._last_waiter
+        if wait <= 0 and (previous is None or previous.done()):
+            self.acquired += 1
+            return
+        turn = asyncio.get_running_loop().create_future()
+        self._last_waiter = turn
+        try:
+            if previous is not None and not previous.done():
+                # Shielded: our cancellation must not cancel the earlier waiter's turn
+                await asyncio.shield(previous)
+            remaining = ready_at - time.monotonic()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+        except asyncio.CancelledError:
+            if self.tat == reserved_tat:  # give back an unused last slot
+                self.tat -= weight * self.interval
+            raise
+        finally:
+            if not turn.done():
+                turn.set_result(None)   # let the next waiter go, even if we were cancelled
+        waited = time.monotonic() - now
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        self.acquired += 1
+    
+    def metrics(self):
+        return {
+            'acquired': self.acquired,
+            'rejected': self.rejected,
+            'average_wait': self.total_wait / self.acquired if self.acquired else 0.0,
+            'max_wait': self.max_wait,
+        }
+
+class KeyedRateLimiter:
+    """One AsyncRateLimiter per key (user, API token...), least recently used idle ones evicted"""
+    
+    def __init__(self, max_requests=5, time_window=1, burst=None, max_keys=10000):
+        self.settings = (max_requests, time_window, burst)
+        self.max_keys = max_keys
+        self.limiters = OrderedDict()
+    
+    def limiter_for(self, key):
+        limiter = self.limiters.get(key)
+        if limiter is None:
+            limiter = self.limiters[key] = AsyncRateLimiter(*self.settings)
+            if len(self.limiters) > self.max_keys:
+                self._evict_idle(keep=key)
+        else:
+            self.limiters.move_to_end(key)
+        return limiter
+    
+    def _evict_idle(self, keep):
+        # Only a limiter whose bucket has refilled can go: a fresh one for
+        # the same key starts with a full bucket, so nothing is forgotten.
+        # If every key is busy we go over max_keys for a while instead.
+        now = time.monotonic()
+        excess = len(self.limiters) - self.max_keys
+        idle = []
+        for key, limiter in self.limiters.items():
+            if len(idle) == excess:
+                break
+            if key != keep and limiter.tat <= now:
+                idle.append(key)
+        for key in idle:
+            del self.limiters[key]
+    
+    async def acquire(self, key, weight=1, timeout=None):
+        await self.limiter_for(key).acquire(weight, timeout)
 
 async def async_rate_limiter_example():
     rate_limiter = AsyncRateLimiter(max_requests=2, time_window=1)
@@ -660,8 +1978,43 @@ async def async_rate_limiter_example():
     
     tasks = [make_request(i) for i in range(5)]
     await asyncio.gather(*tasks)
+    print(f"Limiter metrics: {rate_limiter.metrics()}")
 
 asyncio.run(async_rate_limiter_example())
 
+async def rate_limiter_load_test():
+    # 10,000 concurrent tasks through a 20,000/s limiter with a burst of 500
+    limiter = AsyncRateLimiter(max_requests=20000, time_window=1, burst=500)
+    order = []
+    
+    async def request(i):
+        await limiter.acquire()
+        order.append(i)
+    
+    start = time.monotonic()
+    await asyncio.gather(*(request(i) for i in range(10000)))
+    elapsed = time.monotonic() - start
+    print(f"10,000 tasks in {elapsed:.2f}s, FIFO order kept: {order == sorted(order)}")
+    
+    # Weighted requests and non-blocking checks
+    bulk = AsyncRateLimiter(max_requests=10, time_window=1)
+    await bulk.acquire(weight=8)
+    print(f"try_acquire(weight=5) after using 8 of 10 tokens: {bulk.try_acquire(weight=5)}")
+    try:
+        await bulk.acquire(weight=5, timeout=0.1)
+    except RateLimitExceeded as e:
+        print(f"RateLimitExceeded: {e}")
+    print(f"Bulk limiter metrics: {bulk.metrics()}")
+    
+    per_user = KeyedRateLimiter(max_requests=10, time_window=0.1, max_keys=2)
+    for user in ["alice", "bob", "carol"]:
+        await per_user.acquire(user)
+    print(f"Per-key limiters while all are busy: {list(per_user.limiters)}")
+    await asyncio.sleep(0.02)   # alice's and bob's buckets refill
+    await per_user.acquire("dave")
+    print(f"After idle limiters are evicted (max 2): {list(per_user.limiters)}")
+
+asyncio.run(rate_limiter_load_test())
+
 print("\n🎉 Congratulations! You've completed Lesson 26!")
 print("Next: Lesson 27 - Multithreading")
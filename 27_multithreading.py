@@ -405,6 +405,8 @@ print("\n=== When to Use Threading vs Asyncio ===")
 # - Event-driven programming
 # - Single-threaded concurrency
 
+import asyncio
+
 def threading_vs_asyncio_example():
     # Threading approach
     def threaded_io_task():
@@ -604,6 +606,158 @@ def thread_safe_queue_example():
 
 thread_safe_queue_example()
 
+# Batched queue: one lock round-trip per batch instead of per item
+import queue
+from collections import deque
+
+class BatchQueue:
+    """Thread-safe FIFO with put_many/get_batch and backpressure metrics
+    
+    queue.Queue takes its lock and signals a condition for every item.
+    Here a whole list goes in or comes out under one lock acquisition.
+    get_batch can linger briefly after the first item arrives so that
+    slow trickles still come out in useful batches. close() replaces the
+    None sentinel: consumers drain what is left, then get an empty list.
+    """
+    
+    def __init__(self, maxsize=0):
+        self.maxsize = maxsize
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._closed = False
+        self.high_watermark = 0
+        self.put_blocked = 0.0      # seconds producers spent waiting for room
+        self.get_blocked = 0.0      # seconds consumers spent waiting for items
+        self.items_in = 0
+        self.batches_out = 0
+    
+    def put(self, item, timeout=None):
+        self.put_many((item,), timeout)
+    
+    def put_many(self, items, timeout=None):
+        """Append items, waiting for room when maxsize is set; raises queue.Full on timeout"""
+        items = list(items)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while items:
+                if self._closed:
+                    raise ValueError("put on a closed BatchQueue")
+                room = self.maxsize - len(self._items) if self.maxsize else len(items)
+                if room <= 0:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise queue.Full
+                    waited = time.monotonic()
+                    self._not_full.wait(remaining)
+                    self.put_blocked += time.monotonic() - waited
+                    continue
+                chunk, items = items[:room], items[room:]
+                self._items.extend(chunk)
+                self.items_in += len(chunk)
+                self.high_watermark = max(self.high_watermark, len(self._items))
+                self._not_empty.notify()
+    
+    def get_batch(self, max_n=100, timeout=None, linger=0.0):
+        """Up to max_n items; [] after timeout or once closed and drained"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            waited = time.monotonic()
+            while not self._items and not self._closed:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._not_empty.wait(remaining)
+            if linger > 0 and self._items and len(self._items) < max_n:
+                linger_until = time.monotonic() + linger
+                while len(self._items) < max_n and not self._closed:
+                    remaining = linger_until - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._not_empty.wait(remaining)
+            self.get_blocked += time.monotonic() - waited
+            count = min(max_n, len(self._items))
+            batch = [self._items.popleft() for _ in range(count)]
+            if batch:
+                self.batches_out += 1
+                self._not_full.notify_all()
+                if self._items:
+                    self._not_empty.notify()    # leftovers for another consumer
+            return batch
+    
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+    
+    def metrics(self):
+        with self._lock:
+            return {
+                "size": len(self._items),
+                "high_watermark": self.high_watermark,
+                "items": self.items_in,
+                "batches": self.batches_out,
+                "put_blocked": self.put_blocked,
+                "get_blocked": self.get_blocked,
+            }
+
+def batch_queue_example():
+    n = 200_000
+    
+    # One item at a time through queue.Queue
+    q = queue.Queue(maxsize=10_000)
+    
+    def single_producer():
+        for i in range(n):
+            q.put(i)
+        q.put(None)
+    
+    def single_consumer():
+        while q.get() is not None:
+            pass
+    
+    start = time.perf_counter()
+    threads = [threading.Thread(target=single_producer), threading.Thread(target=single_consumer)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    single_time = time.perf_counter() - start
+    
+    # Same items in batches of 1,000
+    bq = BatchQueue(maxsize=10_000)
+    received = []
+    
+    def batch_producer():
+        for i in range(0, n, 1000):
+            bq.put_many(range(i, i + 1000))
+        bq.close()
+    
+    def batch_consumer():
+        while True:
+            batch = bq.get_batch(max_n=1000, linger=0.001)
+            if not batch:
+                break
+            received.extend(batch)
+    
+    start = time.perf_counter()
+    threads = [threading.Thread(target=batch_producer), threading.Thread(target=batch_consumer)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batch_time = time.perf_counter() - start
+    
+    print(f"queue.Queue: {n / single_time:,.0f} items/s; BatchQueue: {n / batch_time:,.0f} items/s "
+          f"({single_time / batch_time:.0f}x), all received in order: {received == list(range(n))}")
+    metrics = bq.metrics()
+    print(f"BatchQueue: {metrics['batches']} batches, high watermark {metrics['high_watermark']}, "
+          f"producer blocked {metrics['put_blocked']:.3f}s, consumer blocked {metrics['get_blocked']:.3f}s")
+
+batch_queue_example()
+
 # 12. Thread Debugging
 print("\n=== Thread Debugging ===")
 
@@ -125,6 +125,182 @@ def queue_example():
 
 queue_example()
 
+# Batched queue: pickle and send lists instead of single items
+import queue as queue_module
+import threading
+from collections import deque
+
+class BatchProcessQueue:
+    """multiprocessing.Queue wrapper that moves items in batches
+    
+    Every multiprocessing.Queue.put pickles its object and writes it to a
+    pipe, so sending items one by one pays that cost per item. Producers
+    here buffer items and send a whole list when batch_size items are
+    waiting or the oldest has lingered for `linger` seconds, checked by a
+    background flusher thread so a quiet producer's last items still go
+    out; consumers unpack a list and hand out up to max_n items at a time.
+    The metrics live in shared memory so the parent can read what the
+    children saw.
+    """
+    
+    _END = "__batch_queue_end__"
+    
+    def __init__(self, maxsize=0, batch_size=1000, linger=0.005):
+        self._queue = multiprocessing.Queue(maxsize)    # maxsize counts batches
+        self.batch_size = batch_size
+        self.linger = linger
+        self._buffer = []
+        self._buffer_since = 0.0
+        self._received = deque()
+        self._closed = False
+        # in flight, high watermark, producer blocked seconds, consumer blocked seconds
+        self._stats = multiprocessing.Array("d", 4)
+        # Created on first put, in the producer's own process: locks and
+        # threads can't be pickled into a child, and a forked child gets
+        # the lock but not the thread
+        self._lock = None
+        self._flusher = None
+        self._stopped = None
+        self._flusher_pid = None
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.update(_buffer=[], _lock=None, _flusher=None, _stopped=None, _flusher_pid=None)
+        return state
+    
+    def _start_flusher(self):
+        self._flusher_pid = os.getpid()
+        self._buffer = []
+        self._lock = threading.RLock()
+        self._stopped = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_lingering, daemon=True)
+        self._flusher.start()
+    
+    def _flush_lingering(self):
+        while not self._stopped.wait(self.linger):
+            with self._lock:
+                if self._buffer and time.monotonic() - self._buffer_since >= self.linger:
+                    self.flush()
+    
+    def _send(self, batch):
+        started = time.perf_counter()
+        self._queue.put(batch)
+        blocked = time.perf_counter() - started
+        with self._stats.get_lock():
+            self._stats[0] += len(batch)
+            self._stats[1] = max(self._stats[1], self._stats[0])
+            self._stats[2] += blocked
+    
+    def put(self, item):
+        if self._flusher_pid != os.getpid():
+            self._start_flusher()
+        with self._lock:
+            if not self._buffer:
+                self._buffer_since = time.monotonic()
+            self._buffer.append(item)
+            if len(self._buffer) >= self.batch_size:
+                self.flush()
+    
+    def put_many(self, items):
+        if self._flusher_pid != os.getpid():
+            self._start_flusher()
+        with self._lock:
+            if not self._buffer:
+                self._buffer_since = time.monotonic()
+            self._buffer.extend(items)
+            while len(self._buffer) >= self.batch_size:
+                self._send(self._buffer[:self.batch_size])
+                del self._buffer[:self.batch_size]
+    
+    def flush(self):
+        if self._flusher_pid != os.getpid():
+            return  # nothing was ever put in this process
+        with self._lock:
+            if self._buffer:
+                self._send(self._buffer)
+                self._buffer = []
+    
+    def close(self):
+        """Flush and tell every consumer the stream has ended"""
+        if self._stopped is not None:
+            self._stopped.set()
+        self.flush()
+        self._queue.put(self._END)
+    
+    def get_batch(self, max_n=1000, timeout=None):
+        """Up to max_n items; [] on timeout or after the producer closed"""
+        if not self._received and not self._closed:
+            started = time.perf_counter()
+            try:
+                batch = self._queue.get(timeout=timeout)
+            except queue_module.Empty:
+                batch = []
+            with self._stats.get_lock():
+                self._stats[3] += time.perf_counter() - started
+            if batch == self._END:
+                self._closed = True
+                self._queue.put(self._END)  # pass it on to the other consumers
+            else:
+                self._received.extend(batch)
+        count = min(max_n, len(self._received))
+        items = [self._received.popleft() for _ in range(count)]
+        if items:
+            with self._stats.get_lock():
+                self._stats[0] -= count
+        return items
+    
+    def metrics(self):
+        with self._stats.get_lock():
+            in_flight, high_watermark, put_blocked, get_blocked = self._stats[:]
+        return {
+            "in_flight": int(in_flight),
+            "high_watermark": int(high_watermark),
+            "put_blocked": put_blocked,
+            "get_blocked": get_blocked,
+        }
+
+def batch_queue_example():
+    n = 100_000
+    
+    def single_producer(q):
+        for i in range(n):
+            q.put(i)
+        q.put(None)
+    
+    def batch_producer(q):
+        for i in range(n):
+            q.put(i)        # buffered, sent 1,000 at a time
+        q.close()
+    
+    q = multiprocessing.Queue()
+    start = time.perf_counter()
+    producer_process = multiprocessing.Process(target=single_producer, args=(q,))
+    producer_process.start()
+    total = 0
+    while (item := q.get()) is not None:
+        total += item
+    producer_process.join()
+    single_time = time.perf_counter() - start
+    
+    bq = BatchProcessQueue(maxsize=50, batch_size=1000)
+    start = time.perf_counter()
+    producer_process = multiprocessing.Process(target=batch_producer, args=(bq,))
+    producer_process.start()
+    batch_total = 0
+    while batch := bq.get_batch(max_n=1000):
+        batch_total += sum(batch)
+    producer_process.join()
+    batch_time = time.perf_counter() - start
+    
+    metrics = bq.metrics()
+    print(f"multiprocessing.Queue: {n / single_time:,.0f} items/s; BatchProcessQueue: "
+          f"{n / batch_time:,.0f} items/s ({single_time / batch_time:.0f}x), "
+          f"same sum: {total == batch_total}")
+    print(f"BatchProcessQueue: high watermark {metrics['high_watermark']} items, "
+          f"producer blocked {metrics['put_blocked']:.3f}s, consumer blocked {metrics['get_blocked']:.3f}s")
+
+batch_queue_example()
+
 # Pipe for bidirectional communication
 def pipe_example():
     parent_conn, child_conn = multiprocessing.Pipe()
@@ -608,22 +784,26 @@ print("\n--- Exercise Solutions ---")
 
 # 1. Prime number finder
 print("Exercise 1: Prime Number Finder")
+from itertools import compress
+
+def find_primes_in_range(start, end):
+    """Segmented sieve: cross off multiples of the primes up to sqrt(end)"""
+    limit = int(end ** 0.5) + 1
+    small = bytearray([1]) * max(limit, 2)
+    small[0] = small[1] = 0
+    for p in range(2, int(limit ** 0.5) + 1):
+        if small[p]:
+            small[p * p::p] = bytes(len(range(p * p, limit, p)))
+    
+    flags = bytearray([1]) * (end - start)
+    for p in compress(range(limit), small):
+        first = max(p * p, (start + p - 1) // p * p)
+        flags[first - start::p] = bytes(len(range(first - start, end - start, p)))
+    for n in range(start, min(2, end)):
+        flags[n - start] = 0    # 0 and 1 are not prime
+    return list(compress(range(start, end), flags))
+
 def prime_number_finder():
-    def is_prime(n):
-        if n < 2:
-            return False
-        for i in range(2, int(n**0.5) + 1):
-            if n % i == 0:
-                return False
-        return True
-    
-    def find_primes_in_range(start, end):
-        primes = []
-        for i in range(start, end):
-            if is_prime(i):
-                primes.append(i)
-        return primes
-    
     # Split range into chunks
     start, end = 2, 1000
     chunk_size = 100